@@ -1,27 +1,59 @@
 import os
-import csv
-import re
-from data.player import Player
+import sqlite3
+from data.player import Player, EASTERN, CENTRAL
+from data.player_table import PlayerTable
+from data.entry_table import parse_entry_file
+from data.lock_timeline import LockTimeline
+from data.database import get_connection, load_name_aliases, save_name_aliases
+from data.name_resolver import NameResolver
+from data.readers import available_backend, read_csv_columns, to_float_array
+from data.snapshot import compute_snapshot_key, load_snapshot, save_snapshot
 from utils.config import load_config, get_project_root
-from utils.utils import parse_game_time
-from datetime import datetime, timedelta
-import pytz
-import itertools
+from utils.utils import parse_game_time, parse_game_times, NO_GAME_TIME
+from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Columns read from each input file
+PLAYER_ID_COLUMNS = ("Name", "ID", "Salary", "Game Info", "TeamAbbrev")
+PROJECTION_COLUMNS = ("Name", "Team", "Position", "Fpts", "Minutes")
+BOOM_BUST_COLUMNS = ("Name", "Team", "Ceiling", "Boom%", "Bust%", "Std Dev")
+OWNERSHIP_COLUMNS = ("Name", "Team", "Ownership %")
+
+# Values of a player without a row in a source file, as a cold load leaves them
+PROJECTION_DEFAULTS = {"fpts": 0, "minutes": 0, "position": []}
+BOOM_BUST_DEFAULTS = {"ceiling": 0, "boom_pct": 0, "bust_pct": 0, "stddev": 0}
+OWNERSHIP_DEFAULTS = {"ownership": 0}
 
 
 class DataManager:
-    def __init__(self, site):
+    # Files that can change before lock, mapped to the loader that re-reads them
+    WATCHED_FILES = {
+        "projection_path": "_load_projections",
+        "boom_bust_path": "_load_boom_bust",
+        "ownership_path": "_load_ownership",
+    }
+
+    def __init__(self, site, config=None):
         self.site = site
-        self.config = load_config(site)
+        self.config = config if config is not None else load_config(site)
         self.players = []
+        self.player_table = None
+        self.snapshot_key = None
+        self.watched_signatures = {}
+        self.csv_backend = None  # resolved from config on first read
         self.rename_dict = {
             "Nicolas Claxton": "Nic Claxton",
-            "Royce O'Neale": "Royce O'neale",
             # ownership.csv: projections.csv
         }
+        self.name_resolver = None  # built once the players are known
+        self.unmatched_rows = {}  # source file -> list of (name, team) rows with no player
+        self.matched_ids = {}  # source file -> set of ids of the players it has a row for
         self.lineups = []
-        self.ids_to_gametime = {}
-        self.eastern = pytz.timezone("US/Eastern")
+        self.ids_to_lock_ts = {}  # player id -> lock time as a Unix epoch
+        self.lock_timeline = None  # LockTimeline over every player in player_ids.csv
+        self.eastern = EASTERN
 
 
     def _resolve_path(self, relative_path):
@@ -31,217 +63,364 @@ class DataManager:
         :return: The absolute path.
         """
         return os.path.join(get_project_root(), relative_path)
-    
-    def populate_ids_to_gametime(self):
+
+    def _find_players(self, names, teams):
         """
-        Populate the ids_to_gametime dictionary with timezone-aware datetimes,
-        adjusting the lock time to be one hour earlier than the actual game time.
+        Look up the players of every row of one source file, see NameResolver.resolve_all.
+        :return: List with the matching Player (or None) of every row.
         """
-        self.ids_to_gametime = {
-            player.id: player.gametime
-            for player in self.players
-            if hasattr(player, "id") and hasattr(player, "gametime") and player.id and player.gametime
-        }
-        print(f"Populated ids_to_gametime with {len(self.ids_to_gametime)} entries, adjusted lock time by -1 hour.")
+        return self.name_resolver.resolve_all(names, teams)
+
+    def _build_name_resolver(self):
+        """
+        Index the loaded players for name matching, seeded with the rename_dict and the
+        aliases persisted by earlier loads.
+        """
+        aliases = {(alias, None): name for alias, name in self.rename_dict.items()}
+        try:
+            aliases.update(load_name_aliases(get_connection(self.config.db_path)))
+        except sqlite3.Error as e:
+            print(f"Could not read name aliases: {e}")
+        self.name_resolver = NameResolver(aliases, cutoff=self.config.get("name_match_cutoff", 0.85))
+        for player in self.players:
+            self.name_resolver.add_player(player)
 
+    def _save_name_aliases(self):
+        """
+        Persist the aliases found by fuzzy matching so later loads resolve them directly.
+        """
+        new_aliases = self.name_resolver.pop_new_aliases()
+        if not new_aliases:
+            return
+        for (alias, team), name in new_aliases.items():
+            print(f"Matched '{alias}' ({team}) to '{name}'.")
+        try:
+            save_name_aliases(new_aliases, get_connection(self.config.db_path))
+        except sqlite3.Error as e:
+            print(f"Could not save name aliases: {e}")
 
+    def _report_unmatched(self, source, unmatched):
+        """
+        Record and print the rows of a source file that did not match any player.
+        :param source: Short label for the source file (e.g. 'projections').
+        :param unmatched: List of (name, team) tuples that were not matched.
+        """
+        self.unmatched_rows[source] = unmatched
+        if not unmatched:
+            print(f"All {source} rows matched a player.")
+            return
+        print(f"Warning: {len(unmatched)} {source} rows did not match a player:")
+        for name, team in unmatched:
+            print(f"  {name} ({team})")
 
+    def _reset_missing(self, source, updates, defaults):
+        """
+        Reset the players a source file matched on its previous load but no longer has a
+        row for (e.g. ruled out and dropped) to the values a cold load gives them, and
+        record the players matched now.
+        :param source: Short label for the source file (e.g. 'projections').
+        :param updates: List of (player, {field: new value}) pairs of the file's rows.
+        :param defaults: Dict of field -> value of a player without a row.
+        :return: The updates with a reset appended for every dropped player.
+        """
+        matched = {player.id for player, _ in updates}
+        previous = self.matched_ids.get(source, set())
+        self.matched_ids[source] = matched
+        for player in self.players:
+            if player.id in previous and player.id not in matched:
+                updates.append((player, {
+                    field: list(value) if isinstance(value, list) else value
+                    for field, value in defaults.items()
+                }))
+        return updates
     
-    def load_player_data(self):
+    def load_player_data(self, use_cache=True):
         """
         Load all player data based on their presence in the player_ids.csv file.
         Populate additional data such as projections, ownership, and boom-bust values.
+        :param use_cache: Reuse the slate snapshot when none of the inputs changed.
         """
-        # First initialize players from player_ids.csv
-        self._initialize_players_from_ids(self._resolve_path(self.config["player_path"]))
+        paths = [
+            self._resolve_path(self.config[key])
+            for key in ("player_path", "projection_path", "boom_bust_path", "ownership_path")
+        ]
+        self.snapshot_key = compute_snapshot_key(paths, self.config)
+        cache_dir = self._snapshot_cache_dir()
 
-        # Populate additional data for players
-        self._load_projections(self._resolve_path(self.config["projection_path"]))
-        self._load_boom_bust(self._resolve_path(self.config["boom_bust_path"]))
-        self._load_ownership(self._resolve_path(self.config["ownership_path"]))
+        snapshot = load_snapshot(cache_dir, self.snapshot_key) if use_cache else None
+        if snapshot is not None:
+            self.players = snapshot["players"]
+            self.unmatched_rows = snapshot["unmatched_rows"]
+            self.matched_ids = snapshot["matched_ids"]
+            self._build_name_resolver()
+            self.ids_to_lock_ts = {
+                player.id: int(player.lock_ts) if player.gametime is not None else NO_GAME_TIME
+                for player in self.players
+            }
+            self.lock_timeline = LockTimeline(list(self.ids_to_lock_ts.values()), list(self.ids_to_lock_ts))
+            print(f"Loaded {len(self.players)} players from slate snapshot {self.snapshot_key[:12]}.")
+        else:
+            # Read the four files concurrently, then apply them in dependency order
+            column_sets = (PLAYER_ID_COLUMNS, PROJECTION_COLUMNS, BOOM_BUST_COLUMNS, OWNERSHIP_COLUMNS)
+            with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+                futures = [
+                    pool.submit(self._read_columns, path, columns) for path, columns in zip(paths, column_sets)
+                ]
+                ids_columns, projection_columns, boom_bust_columns, ownership_columns = [
+                    future.result() for future in futures
+                ]
 
+            # First initialize players from player_ids.csv
+            self._apply_player_ids(ids_columns)
+
+            # Populate additional data for players
+            self._apply_projections(projection_columns)
+            self._apply_boom_bust(boom_bust_columns)
+            self._apply_ownership(ownership_columns)
+            self._save_name_aliases()
+
+            if use_cache:
+                save_snapshot(
+                    cache_dir,
+                    self.snapshot_key,
+                    {
+                        "players": self.players,
+                        "unmatched_rows": self.unmatched_rows,
+                        "matched_ids": self.matched_ids,
+                    },
+                )
+
+        self.player_table = self.build_player_table()
+        self._record_watched_signatures()
+
+    def _snapshot_cache_dir(self):
+        """
+        Directory for slate snapshots: the configured snapshot_cache_path, or a
+        'cache' folder next to player_ids.csv.
+        """
+        if self.config.get("snapshot_cache_path"):
+            return self._resolve_path(self.config["snapshot_cache_path"])
+        return os.path.join(os.path.dirname(self._resolve_path(self.config["player_path"])), "cache")
+
+    def build_player_table(self, players=None):
+        """
+        Build a columnar PlayerTable for a player pool.
+        :param players: Players to include (default: every loaded player).
+        :return: PlayerTable whose rows follow the order of the given players.
+        """
+        return PlayerTable(self.players if players is None else players)
+
+
+    def _read_columns(self, path, columns):
+        """
+        Read the given columns of a CSV with the configured csv_backend.
+        """
+        if self.csv_backend is None:
+            self.csv_backend = available_backend(self.config.get("csv_backend", "auto"))
+        return read_csv_columns(path, columns, self.csv_backend)
 
     def _load_projections(self, path):
         """
         Add projections data to the initialized players.
+        :return: Change set of the players whose values changed.
         """
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                positions = row["Position"].split("/")
-                if self.site == "dk":
-                    if "PG" in positions or "SG" in positions:
-                        positions.append("G")
-                    if "SF" in positions or "PF" in positions:
-                        positions.append("F")
-                    positions.append("UTIL")
-
-                matched = False
-                for player in self.players:
-                    if player.name == row["Name"].strip() and player.team == row["Team"]:
-                        player.fpts = float(row["Fpts"])
-                        player.minutes = float(row["Minutes"])
-                        player.position = positions
-                        matched = True
-                        break
-                
-                if not matched:
-                    print(f"Warning: No matching player found for {row['Name']} on team {row['Team']}")
+        return self._apply_projections(self._read_columns(path, PROJECTION_COLUMNS))
+
+    def _apply_projections(self, columns):
+        updates = []
+        unmatched = []
+        fpts = to_float_array(columns["Fpts"])
+        minutes = to_float_array(columns["Minutes"])
+        players = self._find_players(columns["Name"], columns["Team"])
+        for i, (name, team, position) in enumerate(zip(columns["Name"], columns["Team"], columns["Position"])):
+            positions = position.split("/")
+            if self.site == "dk":
+                if "PG" in positions or "SG" in positions:
+                    positions.append("G")
+                if "SF" in positions or "PF" in positions:
+                    positions.append("F")
+                positions.append("UTIL")
+
+            player = players[i]
+            if player is None:
+                unmatched.append((name.strip(), team))
+                continue
+            updates.append((player, {
+                "fpts": float(fpts[i]),
+                "minutes": float(minutes[i]),
+                "position": positions,
+            }))
+
+        self._report_unmatched("projections", unmatched)
+        return self._apply_updates(self._reset_missing("projections", updates, PROJECTION_DEFAULTS))
 
 
     def _load_boom_bust(self, path):
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                for player in self.players:
-                    if player.name == row["Name"].strip() and player.team == row["Team"]:
-                        player.ceiling = float(row["Ceiling"])
-                        player.boom_pct = float(row["Boom%"])
-                        player.bust_pct = float(row["Bust%"])
-                        player.stddev = float(row["Std Dev"])
-                        break
+        return self._apply_boom_bust(self._read_columns(path, BOOM_BUST_COLUMNS))
+
+    def _apply_boom_bust(self, columns):
+        updates = []
+        unmatched = []
+        ceiling = to_float_array(columns["Ceiling"])
+        boom_pct = to_float_array(columns["Boom%"])
+        bust_pct = to_float_array(columns["Bust%"])
+        stddev = to_float_array(columns["Std Dev"])
+        players = self._find_players(columns["Name"], columns["Team"])
+        for i, (name, team) in enumerate(zip(columns["Name"], columns["Team"])):
+            player = players[i]
+            if player is None:
+                unmatched.append((name.strip(), team))
+                continue
+            updates.append((player, {
+                "ceiling": float(ceiling[i]),
+                "boom_pct": float(boom_pct[i]),
+                "bust_pct": float(bust_pct[i]),
+                "stddev": float(stddev[i]),
+            }))
+
+        self._report_unmatched("boom_bust", unmatched)
+        return self._apply_updates(self._reset_missing("boom_bust", updates, BOOM_BUST_DEFAULTS))
 
     def _load_ownership(self, path):
-        # Load ownership file and check against players
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                ownership_name = row["Name"].strip()
-                
-                # Check if the player's name is in the rename_dict
-                if ownership_name in self.rename_dict:
-                    ownership_name = self.rename_dict[ownership_name]  # Use the new name
-
-                # Match against players and update ownership
-                for player in self.players:
-                    if player.name == ownership_name and player.team == row["Team"]:
-                        player.ownership = float(row["Ownership %"])
-                        break
+        return self._apply_ownership(self._read_columns(path, OWNERSHIP_COLUMNS))
 
+    def _apply_ownership(self, columns):
+        # Match ownership rows against players
+        updates = []
+        unmatched = []
+        ownership = to_float_array(columns["Ownership %"])
+        players = self._find_players(columns["Name"], columns["Team"])
+        for i, (name, team) in enumerate(zip(columns["Name"], columns["Team"])):
+            player = players[i]
+            if player is None:
+                unmatched.append((name.strip(), team))
+                continue
+            updates.append((player, {"ownership": float(ownership[i])}))
 
-    def _initialize_players_from_ids(self, path):
+        self._report_unmatched("ownership", unmatched)
+        return self._apply_updates(self._reset_missing("ownership", updates, OWNERSHIP_DEFAULTS))
+
+    def _apply_updates(self, updates):
         """
-        Initialize Player objects based on player_ids.csv.
+        Patch player attributes, touching only the values that differ.
+        :param updates: List of (player, {field: new value}) pairs.
+        :return: Change set {player id: {field: (old value, new value)}}.
         """
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                try:
-                    gametime = parse_game_time(row["Game Info"])
-                except ValueError as e:
-                    print(f"Skipping player {row['Name']} due to game info error: {e}")
-                    gametime = None
-
-                player = Player(
-                    name=row["Name"].strip(),
-                    team=row["TeamAbbrev"],
-                    id=row["ID"],
-                    gametime=gametime, 
-                    salary=int(row["Salary"].replace(",", ""))
-                )
-                self.players.append(player)
-        print(f"Initialized {len(self.players)} players from player_ids.csv.")
+        changes = {}
+        for player, fields in updates:
+            for field, value in fields.items():
+                old = getattr(player, field)
+                if old != value:
+                    setattr(player, field, value)
+                    changes.setdefault(player.id, {})[field] = (old, value)
+        return changes
 
+    def _file_signature(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
 
-    def load_player_lineups(self, path):
+    def _record_watched_signatures(self):
+        self.watched_signatures = {
+            key: self._file_signature(self._resolve_path(self.config[key])) for key in self.WATCHED_FILES
+        }
+
+    def reload_changed(self):
         """
-        Load player lineups from a CSV file, ensuring that current time is correctly converted to match EST.
-        """
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(self.lower_first(file))
-
-            # Convert current time to EST
-            current_time = datetime.now(pytz.timezone("US/Central"))  # Get current time in CST
-            # current_time = datetime(2025,1,7,19,22)
-            current_time = current_time.astimezone(self.eastern)  # Convert to EST
-            print(f"Current time (ET): {current_time}")
-
-            for row in reader:
-                if row["entry id"] != "" and self.site == "dk":
-                    # Extract player IDs from the lineup
-                    PG_id = re.search(r"\((\d+)\)", row["pg"]).group(1)
-                    SG_id = re.search(r"\((\d+)\)", row["sg"]).group(1)
-                    SF_id = re.search(r"\((\d+)\)", row["sf"]).group(1)
-                    PF_id = re.search(r"\((\d+)\)", row["pf"]).group(1)
-                    C_id = re.search(r"\((\d+)\)", row["c"]).group(1)
-                    G_id = re.search(r"\((\d+)\)", row["g"]).group(1)
-                    F_id = re.search(r"\((\d+)\)", row["f"]).group(1)
-                    UTIL_id = re.search(r"\((\d+)\)", row["util"]).group(1)
-
-                    # Print comparison times for each player
-                    for position, player_id in zip(
-                        ["PG", "SG", "SF", "PF", "C", "G", "F", "UTIL"],
-                        [PG_id, SG_id, SF_id, PF_id, C_id, G_id, F_id, UTIL_id]
-                    ):
-                        if player_id in self.ids_to_gametime:
-                            player_time = self.ids_to_gametime[player_id]
-                            print(f"{position} ({player_id}): Current Time: {current_time}, Game Time: {player_time}")
-                        else: 
-                            print(f"{position} ({player_id}):  not found in ids_to_gametime")
-
-                    # Add lineup data, including lock status
-                    self.lineups.append(
-                        {
-                            "Entry ID": row["entry id"],
-                            "Contest ID": row["contest id"],
-                            "Contest Name": row["contest name"],
-                            "Entry Fee": row["entry fee"],
-                            "PG": row["pg"].replace("-", "#"),
-                            "SG": row["sg"].replace("-", "#"),
-                            "SF": row["sf"].replace("-", "#"),
-                            "PF": row["pf"].replace("-", "#"),
-                            "C": row["c"].replace("-", "#"),
-                            "G": row["g"].replace("-", "#"),
-                            "F": row["f"].replace("-", "#"),
-                            "UTIL": row["util"].replace("-", "#"),
-                            "PG_is_locked": (
-                                current_time > self.ids_to_gametime[PG_id]
-                                if PG_id in self.ids_to_gametime
-                                else False
-                            ),
-                            "SG_is_locked": (
-                                current_time > self.ids_to_gametime[SG_id]
-                                if SG_id in self.ids_to_gametime
-                                else False
-                            ),
-                            "SF_is_locked": (
-                                current_time > self.ids_to_gametime[SF_id]
-                                if SF_id in self.ids_to_gametime
-                                else False
-                            ),
-                            "PF_is_locked": (
-                                current_time > self.ids_to_gametime[PF_id]
-                                if PF_id in self.ids_to_gametime
-                                else False
-                            ),
-                            "C_is_locked": (
-                                current_time > self.ids_to_gametime[C_id]
-                                if C_id in self.ids_to_gametime
-                                else False
-                            ),
-                            "G_is_locked": (
-                                current_time > self.ids_to_gametime[G_id]
-                                if G_id in self.ids_to_gametime
-                                else False
-                            ),
-                            "F_is_locked": (
-                                current_time > self.ids_to_gametime[F_id]
-                                if F_id in self.ids_to_gametime
-                                else False
-                            ),
-                            "UTIL_is_locked": (
-                                current_time > self.ids_to_gametime[UTIL_id]
-                                if UTIL_id in self.ids_to_gametime
-                                else False
-                            ),
-                        }
-                    )
-        print(f"Successfully loaded {len(self.lineups)} lineups for late swap.")
+        Re-read the watched files (projections, boom/bust, ownership) that changed on disk
+        since they were last loaded, and patch only the players whose values changed.
+        :return: Change set {player id: {field: (old value, new value)}}; empty if nothing changed.
+        """
+        changes = {}
+        for key, loader in self.WATCHED_FILES.items():
+            path = self._resolve_path(self.config[key])
+            try:
+                signature = self._file_signature(path)
+            except FileNotFoundError:
+                # Deleted (or being replaced) since the last poll; keep the loaded values
+                print(f"Watched file {path} is missing, keeping its last loaded values.")
+                continue
+            if self.watched_signatures.get(key) == signature:
+                continue
+            try:
+                file_changes = getattr(self, loader)(path)
+            except (KeyError, ValueError) as e:
+                # Most likely a file caught mid-write; try again on the next poll
+                print(f"Could not reload {path}: {e}")
+                continue
+            self.watched_signatures[key] = signature
+            for player_id, fields in file_changes.items():
+                changes.setdefault(player_id, {}).update(fields)
+
+        self._save_name_aliases()
+        if changes:
+            self.player_table.refresh()
+            print(f"Reloaded projections: {len(changes)} players changed.")
+        return changes
 
+    def watch(self, on_change, poll_interval=5.0, stop_event=None):
+        """
+        Poll the watched files and hand every non-empty change set to on_change.
+        Blocks until stop_event is set (runs forever when no event is given).
+        :param on_change: Callable receiving the change set returned by reload_changed.
+        :param poll_interval: Seconds between polls.
+        :param stop_event: Optional threading.Event used to stop watching.
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            changes = self.reload_changed()
+            if changes:
+                on_change(changes)
+            stop_event.wait(poll_interval)
 
 
-    def lower_first(self, iterator):
-        return itertools.chain([next(iterator).lower()], iterator)
+    def _initialize_players_from_ids(self, path):
+        """
+        Initialize Player objects based on player_ids.csv.
+        """
+        self._apply_player_ids(self._read_columns(path, PLAYER_ID_COLUMNS))
+
+    def _apply_player_ids(self, columns):
+        # Parse each distinct game once; the lock epochs feed the late-swap lock checks
+        lock_epochs = parse_game_times(columns["Game Info"])
+        self.ids_to_lock_ts = {player_id: int(epoch) for player_id, epoch in zip(columns["ID"], lock_epochs)}
+        self.lock_timeline = LockTimeline(lock_epochs, columns["ID"])
+        salaries = to_float_array(columns["Salary"]).astype(int)
 
+        rows = zip(columns["Name"], columns["TeamAbbrev"], columns["ID"], columns["Game Info"], salaries, lock_epochs)
+        for name, team, player_id, game_info, salary, epoch in rows:
+            if epoch != NO_GAME_TIME:
+                gametime = parse_game_time(game_info)
+            else:
+                print(f"Skipping player {name} due to game info error: '{game_info}'")
+                gametime = None
 
+            player = Player(
+                name=name.strip(),
+                team=team,
+                id=player_id,
+                gametime=gametime,
+                salary=int(salary),
+                matchup=game_info.split()[0] if game_info else None,
+            )
+            self.players.append(player)
+        self._build_name_resolver()
+        print(f"Initialized {len(self.players)} players from player_ids.csv.")
 
+
+    def load_player_lineups(self, path):
+        """
+        Load late-swap entries from a DraftKings entry CSV into an EntryTable.
+        Lock flags are looked up in lock_timeline using one snapshot of the current time.
+        """
+        if self.site != "dk":
+            print(f"Late swap entries are only supported for dk, not {self.site}.")
+            return
+
+        # Convert current time to EST
+        current_time = datetime.now(CENTRAL)  # Get current time in CST
+        # current_time = datetime(2025,1,7,19,22)
+        current_time = current_time.astimezone(self.eastern)  # Convert to EST
+        print(f"Current time (ET): {current_time}")
+
+        self.lineups = parse_entry_file(path, self.lock_timeline, current_time.timestamp())
+        print(f"Successfully loaded {len(self.lineups)} lineups for late swap.")
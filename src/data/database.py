@@ -1,15 +1,15 @@
+import os
+import json  # For serializing the position field
 import sqlite3
+import threading
 from datetime import datetime
+from utils.config import get_project_root
 
-DB_PATH = "C:/Users/samba/nba_dfs/data/dfs_data.db"
+# Default database location, relative to the project root (see the db_path config key)
+DB_PATH = "data/dfs_data.db"
 
-def initialize_database():
-    """Initialize the database (creates it if it doesn't exist)."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Create the players table
-    cursor.execute("""
+# Full copy of the pool per write_players_to_database call; kept for the history already stored in it
+PLAYERS_TABLE = """
         CREATE TABLE IF NOT EXISTS players (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             player_id TEXT,
@@ -26,32 +26,207 @@ def initialize_database():
             bust REAL,
             last_update TIMESTAMP
         )
-    """)
-    conn.commit()
-    conn.close()
+"""
+
+PLAYERS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS players_player ON players (player_id, last_update)",
+    "CREATE INDEX IF NOT EXISTS players_team ON players (team, last_update)",
+)
+
+NAME_ALIASES_TABLE = """
+        CREATE TABLE IF NOT EXISTS name_aliases (
+            alias TEXT NOT NULL,
+            team TEXT NOT NULL,
+            name TEXT NOT NULL,
+            last_update TIMESTAMP,
+            PRIMARY KEY (alias, team)
+        )
+"""
+
+SNAPSHOT_TABLES = (
+    """
+        CREATE TABLE IF NOT EXISTS slates (
+            id INTEGER PRIMARY KEY,
+            site TEXT NOT NULL,
+            name TEXT NOT NULL,
+            UNIQUE (site, name)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY,
+            slate_id INTEGER NOT NULL REFERENCES slates (id),
+            input_hash TEXT NOT NULL,
+            created_at TIMESTAMP,
+            UNIQUE (slate_id, input_hash)
+        )
+    """,
+    # One row per player and snapshot in which any of the player's values changed
+    """
+        CREATE TABLE IF NOT EXISTS player_values (
+            player_id TEXT NOT NULL,
+            snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+            name TEXT,
+            team TEXT,
+            position TEXT,
+            salary REAL,
+            fpts REAL,
+            minutes REAL,
+            ceiling REAL,
+            stddev REAL,
+            ownership REAL,
+            boom REAL,
+            bust REAL,
+            PRIMARY KEY (player_id, snapshot_id)
+        ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS player_values_snapshot ON player_values (snapshot_id, player_id)",
+    "CREATE INDEX IF NOT EXISTS player_values_team ON player_values (team, snapshot_id)",
+)
+
+LINEUP_TABLES = (
+    """
+        CREATE TABLE IF NOT EXISTS lineup_runs (
+            id INTEGER PRIMARY KEY,
+            slate_id INTEGER NOT NULL REFERENCES slates (id),
+            snapshot_id INTEGER REFERENCES snapshots (id),
+            process TEXT NOT NULL,
+            contest_style TEXT,
+            config_hash TEXT,
+            created_at TIMESTAMP
+        )
+    """,
+    # lineup_key is the comma-joined sorted player ids, identical for identical rosters
+    """
+        CREATE TABLE IF NOT EXISTS lineups (
+            id INTEGER PRIMARY KEY,
+            run_id INTEGER NOT NULL REFERENCES lineup_runs (id),
+            lineup_key TEXT NOT NULL,
+            fpts REAL,
+            ownership REAL,
+            boom REAL,
+            salary REAL
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS lineup_players (
+            lineup_id INTEGER NOT NULL REFERENCES lineups (id),
+            player_id TEXT NOT NULL,
+            position TEXT NOT NULL,
+            PRIMARY KEY (lineup_id, player_id)
+        ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS lineups_run ON lineups (run_id)",
+    "CREATE INDEX IF NOT EXISTS lineups_key ON lineups (lineup_key)",
+    "CREATE INDEX IF NOT EXISTS lineup_players_player ON lineup_players (player_id, lineup_id)",
+)
+
+# Columns of player_values after the keys, in the order of _player_values
+PLAYER_VALUE_COLUMNS = (
+    "name", "team", "position", "salary", "fpts", "minutes", "ceiling", "stddev", "ownership", "boom", "bust",
+)
+
+# Open connections by resolved path; shared by every caller and thread of the process
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def resolve_db_path(db_path=None):
+    """
+    :param db_path: ':memory:', an absolute path, or a path relative to the project root
+                    (default: DB_PATH).
+    :return: Path to hand to sqlite3.connect.
+    """
+    db_path = db_path or DB_PATH
+    if db_path == ":memory:" or os.path.isabs(db_path):
+        return db_path
+    return os.path.join(get_project_root(), db_path)
+
+
+def get_connection(db_path=None):
+    """
+    Return the process-wide connection to a database, opening it on first use.
+
+    File databases are switched to WAL journaling so readers never wait on the writer,
+    and the schema is created when the connection is opened. The connection can be
+    handed between threads, but writes from several threads must be serialized by the
+    caller; each write should run in one `with conn:` transaction.
+
+    :param db_path: Database path, see resolve_db_path.
+    :return: sqlite3.Connection.
+    """
+    path = resolve_db_path(db_path)
+    with _connections_lock:
+        conn = _connections.get(path)
+        if conn is None:
+            conn = _connect(path)
+            _connections[path] = conn
+    return conn
+
+
+def open_connection(db_path=None):
+    """
+    Open a separate connection to a database, for a thread that writes on its own (see
+    DatabaseWriter): its transactions never mix with writes made through get_connection.
+    An in-memory database only exists on its one connection, so ':memory:' returns the
+    shared connection instead.
+    :param db_path: Database path, see resolve_db_path.
+    :return: Tuple of (sqlite3.Connection, True if the caller owns and must close it).
+    """
+    path = resolve_db_path(db_path)
+    if path == ":memory:":
+        return get_connection(path), False
+    return _connect(path), True
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    if path != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    _create_tables(conn)
+    return conn
+
+
+def close_connections():
+    """Close every connection opened by get_connection."""
+    with _connections_lock:
+        for conn in _connections.values():
+            conn.close()
+        _connections.clear()
+
+
+def _create_tables(conn):
+    with conn:
+        conn.execute(PLAYERS_TABLE)
+        for statement in PLAYERS_INDEXES:
+            conn.execute(statement)
+        # Name aliases (normalized source name -> normalized DraftKings name)
+        conn.execute(NAME_ALIASES_TABLE)
+        for statement in SNAPSHOT_TABLES + LINEUP_TABLES:
+            conn.execute(statement)
+
+
+def initialize_database(db_path=None):
+    """Initialize the database (creates it if it doesn't exist)."""
+    return get_connection(db_path)
 
-import json  # For serializing the position field
 
-def write_players_to_database(players):
-    """Write player objects to the database."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+def write_players_to_database(players, conn=None):
+    """
+    Write player objects to the database in a single transaction.
+    :param players: Players to write.
+    :param conn: Connection to write through (default: get_connection()).
+    """
+    conn = conn or get_connection()
     timestamp = datetime.now().isoformat()
-    
-    for player in players:
-        # Serialize the position field as JSON
-        position_json = json.dumps(player.position)
-        
-        cursor.execute("""
-            INSERT INTO players (
-                player_id, name, team, position, salary, fpts, minutes, ceiling, stddev, ownership, boom, bust, last_update
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+
+    rows = [
+        (
             player.id,
             player.name,
             player.team,
-            position_json,  # Store serialized JSON
+            json.dumps(player.position),  # Store serialized JSON
             player.salary,
             player.fpts,
             player.minutes,
@@ -60,8 +235,272 @@ def write_players_to_database(players):
             player.ownership,
             player.boom_pct,
             player.bust_pct,
-            timestamp
-        ))
-    
-    conn.commit()
-    conn.close()
+            timestamp,
+        )
+        for player in players
+    ]
+    with conn:
+        conn.executemany("""
+            INSERT INTO players (
+                player_id, name, team, position, salary, fpts, minutes, ceiling, stddev, ownership, boom, bust, last_update
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+
+def load_name_aliases(conn=None):
+    """
+    Read the name aliases resolved on previous loads.
+    :param conn: Connection to read through (default: get_connection()).
+    :return: Dict of (alias, team) -> player name, both normalized.
+    """
+    conn = conn or get_connection()
+    cursor = conn.execute("SELECT alias, team, name FROM name_aliases")
+    return {(alias, team): name for alias, team, name in cursor}
+
+
+def save_name_aliases(aliases, conn=None):
+    """
+    Insert or update name aliases.
+    :param aliases: Dict of (alias, team) -> player name, both normalized.
+    :param conn: Connection to write through (default: get_connection()).
+    """
+    if not aliases:
+        return
+    conn = conn or get_connection()
+    timestamp = datetime.now().isoformat()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO name_aliases (alias, team, name, last_update) VALUES (?, ?, ?, ?)",
+            [(alias, team, name, timestamp) for (alias, team), name in aliases.items()],
+        )
+
+
+def _player_values(player):
+    return (
+        player.name,
+        player.team,
+        json.dumps(player.position),
+        float(player.salary),
+        float(player.fpts),
+        float(player.minutes),
+        float(player.ceiling),
+        float(player.stddev),
+        float(player.ownership),
+        float(player.boom_pct),
+        float(player.bust_pct),
+    )
+
+
+def get_slate_id(site, slate, conn=None):
+    """
+    :param site: Site of the slate ('dk' or 'fd').
+    :param slate: Slate name (e.g. 'main').
+    :return: Id of the slate row, created if needed.
+    """
+    conn = conn or get_connection()
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO slates (site, name) VALUES (?, ?)", (site, slate))
+    return conn.execute("SELECT id FROM slates WHERE site = ? AND name = ?", (site, slate)).fetchone()[0]
+
+
+def latest_player_values(slate_id, before_snapshot=None, conn=None):
+    """
+    Current values of every player of a slate, as of a snapshot.
+    :param slate_id: Slate id, see get_slate_id.
+    :param before_snapshot: Only consider snapshots with a lower id (default: all).
+    :return: Dict of player id -> tuple of PLAYER_VALUE_COLUMNS values.
+    """
+    conn = conn or get_connection()
+    limit = before_snapshot if before_snapshot is not None else -1
+    cursor = conn.execute(f"""
+        SELECT player_id, {", ".join(PLAYER_VALUE_COLUMNS)}
+        FROM player_values
+        WHERE (player_id, snapshot_id) IN (
+            SELECT player_id, MAX(snapshot_id)
+            FROM player_values
+            WHERE snapshot_id IN (
+                SELECT id FROM snapshots WHERE slate_id = ? AND (? < 0 OR id < ?)
+            )
+            GROUP BY player_id
+        )
+    """, (slate_id, limit, limit))
+    return {row[0]: row[1:] for row in cursor}
+
+
+def write_player_snapshot(players, site, slate, input_hash, conn=None):
+    """
+    Record a snapshot of a slate's player pool, storing only the players whose values
+    changed since the slate's previous snapshot. Writing the same inputs twice is a no-op.
+    :param players: Players of the slate.
+    :param site: Site of the slate.
+    :param slate: Slate name.
+    :param input_hash: Content hash of the slate inputs (DataManager.snapshot_key).
+    :param conn: Connection to write through (default: get_connection()).
+    :return: Tuple of (snapshot id, number of player rows written).
+    """
+    conn = conn or get_connection()
+    slate_id = get_slate_id(site, slate, conn)
+    existing = conn.execute(
+        "SELECT id FROM snapshots WHERE slate_id = ? AND input_hash = ?", (slate_id, input_hash)
+    ).fetchone()
+    if existing is not None:
+        return existing[0], 0
+
+    previous = latest_player_values(slate_id, conn=conn)
+    with conn:
+        snapshot_id = conn.execute(
+            "INSERT INTO snapshots (slate_id, input_hash, created_at) VALUES (?, ?, ?)",
+            (slate_id, input_hash, datetime.now().isoformat()),
+        ).lastrowid
+        rows = []
+        for player in players:
+            values = _player_values(player)
+            if previous.get(player.id) != values:
+                rows.append((player.id, snapshot_id) + values)
+        conn.executemany(
+            f"INSERT INTO player_values (player_id, snapshot_id, {', '.join(PLAYER_VALUE_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * (len(PLAYER_VALUE_COLUMNS) + 2))})",
+            rows,
+        )
+    return snapshot_id, len(rows)
+
+
+def snapshot_changes(snapshot_id, conn=None):
+    """
+    Players whose values changed in a snapshot, compared with the slate's previous one.
+    :param snapshot_id: Snapshot id.
+    :return: Dict of player id -> {column: (old value, new value)}; new players have old value None.
+    """
+    conn = conn or get_connection()
+    slate_id = conn.execute("SELECT slate_id FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()[0]
+    cursor = conn.execute(
+        f"SELECT player_id, {', '.join(PLAYER_VALUE_COLUMNS)} FROM player_values WHERE snapshot_id = ?",
+        (snapshot_id,),
+    )
+    current = {row[0]: row[1:] for row in cursor}
+    previous = latest_player_values(slate_id, before_snapshot=snapshot_id, conn=conn)
+
+    changes = {}
+    for player_id, values in current.items():
+        old_values = previous.get(player_id, (None,) * len(PLAYER_VALUE_COLUMNS))
+        changes[player_id] = {
+            column: (old, new)
+            for column, old, new in zip(PLAYER_VALUE_COLUMNS, old_values, values)
+            if old != new
+        }
+    return changes
+
+
+def lineup_key(player_ids):
+    """
+    :param player_ids: Player ids of a lineup.
+    :return: Order-independent key of the roster.
+    """
+    return ",".join(sorted(player_ids))
+
+
+def _run_filter(run_ids, column="run_id"):
+    """SQL condition and parameters restricting a query to some lineup runs (None: all)."""
+    if run_ids is None:
+        return "1", ()
+    run_ids = tuple(run_ids)
+    return f"{column} IN ({', '.join('?' * len(run_ids))})", run_ids
+
+
+def write_lineup_run(lineups, site, slate, process, contest_style=None, config_hash=None, snapshot_id=None,
+                     conn=None):
+    """
+    Store the lineups of one optimizer run with their metrics.
+    :param lineups: Lineups collection returned by Optimizer.run or LateSwaptimizer.run.
+    :param site: Site of the slate.
+    :param slate: Slate name.
+    :param process: 'main' or 'swap'.
+    :param contest_style: Contest style the lineups were built for (e.g. 'SE').
+    :param config_hash: Fingerprint of the config used (Config.fingerprint()).
+    :param snapshot_id: Player snapshot the lineups were built from, see write_player_snapshot.
+    :param conn: Connection to write through (default: get_connection()).
+    :return: Id of the run.
+    """
+    conn = conn or get_connection()
+    slate_id = get_slate_id(site, slate, conn)
+    with conn:
+        run_id = conn.execute(
+            "INSERT INTO lineup_runs (slate_id, snapshot_id, process, contest_style, config_hash, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (slate_id, snapshot_id, process, contest_style, config_hash, datetime.now().isoformat()),
+        ).lastrowid
+        player_rows = []
+        for lineup, metrics in zip(lineups.lineups, lineups.lineup_metrics):
+            lineup_id = conn.execute(
+                "INSERT INTO lineups (run_id, lineup_key, fpts, ownership, boom, salary) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    lineup_key(player_id for _, _, player_id in lineup),
+                    float(metrics["FPTS"]),
+                    float(metrics["Ownership"]),
+                    float(metrics["Boom"]),
+                    float(metrics["Salary"]),
+                ),
+            ).lastrowid
+            player_rows.extend((lineup_id, player_id, position) for _, position, player_id in lineup)
+        conn.executemany(
+            "INSERT OR IGNORE INTO lineup_players (lineup_id, player_id, position) VALUES (?, ?, ?)", player_rows
+        )
+    return run_id
+
+
+def lineup_exposures(run_ids=None, conn=None):
+    """
+    Exposure of every player across the lineups of some runs.
+    :param run_ids: Lineup run ids (default: every run).
+    :return: Dict of player id -> exposure in percent.
+    """
+    conn = conn or get_connection()
+    condition, params = _run_filter(run_ids)
+    total = conn.execute(f"SELECT COUNT(*) FROM lineups WHERE {condition}", params).fetchone()[0]
+    if not total:
+        return {}
+    cursor = conn.execute(f"""
+        SELECT lineup_players.player_id, COUNT(*)
+        FROM lineup_players JOIN lineups ON lineups.id = lineup_players.lineup_id
+        WHERE {condition}
+        GROUP BY lineup_players.player_id
+    """, params)
+    return {player_id: count / total * 100 for player_id, count in cursor}
+
+
+def lineups_containing(player_id, run_ids=None, conn=None):
+    """
+    :param player_id: Player id.
+    :param run_ids: Lineup run ids (default: every run).
+    :return: List of (lineup id, run id, lineup key) of the lineups with the player.
+    """
+    conn = conn or get_connection()
+    condition, params = _run_filter(run_ids)
+    return conn.execute(f"""
+        SELECT lineups.id, lineups.run_id, lineups.lineup_key
+        FROM lineup_players JOIN lineups ON lineups.id = lineup_players.lineup_id
+        WHERE lineup_players.player_id = ? AND {condition}
+    """, (player_id,) + params).fetchall()
+
+
+def lineup_overlap(lineup_id, run_ids=None, min_shared=1, conn=None):
+    """
+    Lineups sharing players with a given lineup.
+    :param lineup_id: Lineup id.
+    :param run_ids: Lineup run ids to search (default: every run).
+    :param min_shared: Minimum number of shared players.
+    :return: List of (lineup id, shared player count), most shared first.
+    """
+    conn = conn or get_connection()
+    condition, params = _run_filter(run_ids)
+    return conn.execute(f"""
+        SELECT other.lineup_id, COUNT(*) AS shared
+        FROM lineup_players AS own
+        JOIN lineup_players AS other ON other.player_id = own.player_id AND other.lineup_id != own.lineup_id
+        JOIN lineups ON lineups.id = other.lineup_id
+        WHERE own.lineup_id = ? AND {condition}
+        GROUP BY other.lineup_id
+        HAVING shared >= ?
+        ORDER BY shared DESC
+    """, (lineup_id,) + params + (min_shared,)).fetchall()
@@ -0,0 +1,155 @@
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+from data.database import open_connection, resolve_db_path
+
+# Marks the end of the job queue
+_STOP = object()
+
+# Writers by resolved database path, see get_writer
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+class DatabaseWriter:
+    """
+    Runs database writes on a dedicated thread so callers never wait on SQLite.
+
+    Jobs are database functions taking a conn keyword (write_player_snapshot,
+    write_lineup_run, ...). They run in submission order on the writer's own connection
+    (see database.open_connection), so they never share a transaction with writes made
+    through get_connection on other threads, such as DataManager's name aliases. Every job
+    waiting in the queue is drained as one batch, and consecutive submit_rows jobs with
+    the same statement are merged into a single executemany transaction. Arguments are
+    used as they are when the job runs, so do not modify objects after submitting them.
+    """
+
+    def __init__(self, db_path=None, batch_size=256):
+        """
+        :param db_path: Database path, see database.resolve_db_path.
+        :param batch_size: Maximum number of queued jobs run as one batch.
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.jobs = queue.Queue()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+        self.thread.start()
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queue function(*args, conn=<connection>, **kwargs).
+        Future arguments are replaced by their result first, so a job can consume the
+        result of an earlier one (e.g. the snapshot id of write_player_snapshot).
+        :return: Future holding the function's return value.
+        """
+        return self._put(("call", function, args, kwargs))
+
+    def submit_rows(self, sql, rows):
+        """
+        Queue an executemany of sql over rows.
+        :return: Future resolved once the rows are committed.
+        """
+        return self._put(("rows", sql, list(rows), None))
+
+    def _put(self, job):
+        if self.closed:
+            raise RuntimeError("DatabaseWriter is closed")
+        future = Future()
+        self.jobs.put((job, future))
+        return future
+
+    def flush(self):
+        """Block until every job submitted so far has run."""
+        self.jobs.join()
+
+    def close(self):
+        """Run the remaining jobs and stop the writer thread."""
+        if self.closed:
+            return
+        self.closed = True
+        self.jobs.put(_STOP)
+        self.thread.join()
+
+    def _run(self):
+        conn, owned = open_connection(self.db_path)
+        stopping = False
+        while not stopping:
+            batch = [self.jobs.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+            self._run_batch(conn, [item for item in batch if item is not _STOP])
+            for _ in batch:
+                self.jobs.task_done()
+        if owned:
+            conn.close()
+
+    def _run_batch(self, conn, batch):
+        index = 0
+        while index < len(batch):
+            (kind, target, args, kwargs), future = batch[index]
+            if kind == "rows":
+                # Merge the following row jobs with the same statement into one transaction
+                end = index + 1
+                while end < len(batch) and batch[end][0][0] == "rows" and batch[end][0][1] == target:
+                    end += 1
+                futures = [item[1] for item in batch[index:end]]
+                rows = [row for item in batch[index:end] for row in item[0][2]]
+                self._complete(futures, self._execute_rows, conn, target, rows)
+                index = end
+            else:
+                self._complete([future], self._call, conn, target, args, kwargs)
+                index += 1
+
+    def _complete(self, futures, function, *args):
+        try:
+            result = function(*args)
+        except Exception as e:
+            print(f"Database write failed: {e}")
+            for future in futures:
+                future.set_exception(e)
+        else:
+            for future in futures:
+                future.set_result(result)
+
+    def _execute_rows(self, conn, sql, rows):
+        with conn:
+            conn.executemany(sql, rows)
+        return len(rows)
+
+    def _call(self, conn, function, args, kwargs):
+        args = [arg.result() if isinstance(arg, Future) else arg for arg in args]
+        kwargs = {key: value.result() if isinstance(value, Future) else value for key, value in kwargs.items()}
+        return function(*args, conn=conn, **kwargs)
+
+
+def get_writer(db_path=None):
+    """
+    Return the process-wide DatabaseWriter of a database, starting it on first use.
+    Every writer is flushed and stopped when the interpreter exits.
+    :param db_path: Database path, see database.resolve_db_path.
+    """
+    path = resolve_db_path(db_path)
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None or writer.closed:
+            writer = _writers[path] = DatabaseWriter(db_path)
+    return writer
+
+
+def close_writers():
+    """Flush and stop every writer started by get_writer."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_writers)
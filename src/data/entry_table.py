@@ -0,0 +1,112 @@
+import csv
+import re
+import numpy as np
+
+
+# Roster slots of a DraftKings NBA entry, in file order
+DK_SLOTS = ("PG", "SG", "SF", "PF", "C", "G", "F", "UTIL")
+
+# Matches the player id in cells such as "Tyus Jones (37345909) (LOCKED)"
+PLAYER_ID_PATTERN = re.compile(r"\((\d+)\)")
+
+
+class EntryTable:
+    """
+    Compact table of late-swap entries: one row per entry, one column per roster slot.
+
+    entry_ids, contest_names, contest_ids and entry_fees are object arrays of length n;
+    slot_labels, player_ids and locked are (n, len(slots)) arrays holding the cell text,
+    the parsed player id ("" when missing) and the lock flag of every slot.
+    """
+
+    def __init__(self, entry_ids, contest_names, contest_ids, entry_fees, slot_labels, player_ids, locked,
+                 slots=DK_SLOTS):
+        self.slots = slots
+        self.entry_ids = entry_ids
+        self.contest_names = contest_names
+        self.contest_ids = contest_ids
+        self.entry_fees = entry_fees
+        self.slot_labels = slot_labels
+        self.player_ids = player_ids
+        self.locked = locked
+
+    def __len__(self):
+        return len(self.entry_ids)
+
+    def fully_locked(self):
+        """
+        :return: Boolean array, True for entries whose every slot has locked.
+        """
+        return self.locked.all(axis=1)
+
+    def entry(self, index):
+        """
+        Build the dictionary view of one entry used by the late-swap optimizer.
+        :param index: Row of the entry.
+        :return: Dict with the entry info, slot labels, '<slot>_id' and '<slot>_is_locked' keys.
+        """
+        entry = {
+            "Entry ID": self.entry_ids[index],
+            "Contest ID": self.contest_ids[index],
+            "Contest Name": self.contest_names[index],
+            "Entry Fee": self.entry_fees[index],
+        }
+        for column, slot in enumerate(self.slots):
+            entry[slot] = self.slot_labels[index, column]
+            entry[f"{slot}_id"] = self.player_ids[index, column]
+            entry[f"{slot}_is_locked"] = bool(self.locked[index, column])
+        return entry
+
+
+def parse_entry_file(path, lock_timeline, now_ts, slots=DK_SLOTS):
+    """
+    Stream a DraftKings entry (live lineups) CSV into an EntryTable.
+
+    Rows without an entry id (reservations, instructions and the player list DraftKings
+    appends to the file) are skipped. Lock flags are looked up in one pass at the end.
+
+    :param path: Path of the entry CSV.
+    :param lock_timeline: LockTimeline of the slate, built with player ids.
+    :param now_ts: Current time as a Unix epoch; one snapshot for the whole file.
+    :param slots: Roster slot columns to read.
+    :return: EntryTable.
+    """
+    info_rows = []
+    labels = []
+    ids = []
+    search = PLAYER_ID_PATTERN.search
+
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        reader = csv.reader(file)
+        header = [column.strip().lower() for column in next(reader)]
+        info_columns = [header.index(name) for name in ("entry id", "contest name", "contest id", "entry fee")]
+        slot_columns = [header.index(slot.lower()) for slot in slots]
+        entry_column = info_columns[0]
+
+        for row in reader:
+            if len(row) <= entry_column or not row[entry_column]:
+                continue
+            info_rows.append([row[column] for column in info_columns])
+            cells = [row[column] for column in slot_columns]
+            labels.append([cell.replace("-", "#") for cell in cells])
+            matches = [search(cell) for cell in cells]
+            ids.append([match.group(1) if match else "" for match in matches])
+
+    count = len(info_rows)
+    info = np.array(info_rows, dtype=object).reshape(count, 4)
+    player_ids = np.array(ids, dtype=object).reshape(count, len(slots))
+
+    # Ids missing from the slate (row -1) never lock
+    rows = lock_timeline.rows_for(player_ids)
+    locked = np.where(rows >= 0, lock_timeline.locked_mask(now_ts)[rows], False)
+
+    return EntryTable(
+        entry_ids=info[:, 0],
+        contest_names=info[:, 1],
+        contest_ids=info[:, 2],
+        entry_fees=info[:, 3],
+        slot_labels=np.array(labels, dtype=object).reshape(count, len(slots)),
+        player_ids=player_ids,
+        locked=locked,
+        slots=slots,
+    )
@@ -0,0 +1,100 @@
+import numpy as np
+from data.database import get_connection
+
+# Numeric series returned by the history queries (columns of player_values and players)
+HISTORY_VALUES = ("salary", "fpts", "minutes", "ceiling", "stddev", "ownership", "boom", "bust")
+
+# Leading key columns of the snapshot queries and their dtypes
+_SNAPSHOT_KEYS = (
+    ("snapshot_id", np.int64),
+    ("created_at", object),
+    ("player_id", object),
+    ("name", object),
+    ("team", object),
+)
+
+
+def _to_arrays(cursor, keys):
+    """
+    Turn a result set into a dict of column arrays with one fetch.
+    :param cursor: Executed cursor whose columns are the keys followed by HISTORY_VALUES.
+    :param keys: (name, dtype) pairs of the leading columns.
+    :return: Dict of column name -> NumPy array; values are float64 with NULL as nan.
+    """
+    dtypes = list(keys) + [(name, np.float64) for name in HISTORY_VALUES]
+    columns = list(zip(*cursor.fetchall())) or [()] * len(dtypes)
+    return {name: np.array(values, dtype=dtype) for (name, dtype), values in zip(dtypes, columns)}
+
+
+def _snapshot_query(condition):
+    value_columns = ", ".join(f"player_values.{column}" for column in HISTORY_VALUES)
+    return f"""
+        SELECT player_values.snapshot_id, snapshots.created_at, player_values.player_id,
+               player_values.name, player_values.team, {value_columns}
+        FROM player_values JOIN snapshots ON snapshots.id = player_values.snapshot_id
+        WHERE {condition}
+        ORDER BY player_values.snapshot_id, player_values.player_id
+    """
+
+
+def player_history(player_id, conn=None):
+    """
+    Value changes of one player across every snapshot that touched them.
+    Rows exist only where a value changed, so each value holds until the next row.
+    :param player_id: Player id.
+    :param conn: Connection to read through (default: get_connection()).
+    :return: Dict of column -> NumPy array, ordered by snapshot: snapshot_id, created_at,
+             player_id, name, team and the HISTORY_VALUES series.
+    """
+    conn = conn or get_connection()
+    cursor = conn.execute(_snapshot_query("player_values.player_id = ?"), (player_id,))
+    return _to_arrays(cursor, _SNAPSHOT_KEYS)
+
+
+def team_history(team, conn=None):
+    """
+    Value changes of every player of a team, see player_history.
+    :param team: Team abbreviation.
+    """
+    conn = conn or get_connection()
+    cursor = conn.execute(_snapshot_query("player_values.team = ?"), (team,))
+    return _to_arrays(cursor, _SNAPSHOT_KEYS)
+
+
+def slate_history(site, slate, conn=None):
+    """
+    Value changes of every player of a slate, see player_history.
+    :param site: Site of the slate.
+    :param slate: Slate name.
+    """
+    conn = conn or get_connection()
+    cursor = conn.execute(
+        _snapshot_query("""player_values.snapshot_id IN (
+            SELECT snapshots.id FROM snapshots JOIN slates ON slates.id = snapshots.slate_id
+            WHERE slates.site = ? AND slates.name = ?
+        )"""),
+        (site, slate),
+    )
+    return _to_arrays(cursor, _SNAPSHOT_KEYS)
+
+
+def legacy_player_history(player_id=None, team=None, conn=None):
+    """
+    Rows of the legacy players table (full pool copies) for a player or a team.
+    :param player_id: Player id to select.
+    :param team: Team abbreviation to select when no player id is given.
+    :return: Dict of column -> NumPy array ordered by write time: last_update, player_id,
+             name, team and the HISTORY_VALUES series.
+    """
+    if player_id is None and team is None:
+        raise ValueError("legacy_player_history needs a player_id or a team")
+    conn = conn or get_connection()
+    condition, param = ("player_id = ?", player_id) if player_id is not None else ("team = ?", team)
+    value_columns = ", ".join(HISTORY_VALUES)
+    cursor = conn.execute(f"""
+        SELECT last_update, player_id, name, team, {value_columns}
+        FROM players
+        WHERE {condition}
+        ORDER BY last_update
+    """, (param,))
+    return _to_arrays(cursor, (("last_update", object), ("player_id", object), ("name", object), ("team", object)))
@@ -0,0 +1,98 @@
+from bisect import bisect_right
+import numpy as np
+from utils.utils import NO_GAME_TIME
+
+
+class LockTimeline:
+    """
+    Sorted index of the lock times of a slate.
+
+    Players are ordered by lock time once; lock_epochs holds the distinct lock epochs and
+    starts[k] the position in that order where the players locking at lock_epochs[k]
+    begin. At time t the locked players are order[:starts[k]] with k = bisect(lock_epochs, t),
+    so a lock query is one bisect instead of a comparison per player. Players whose lock
+    time is NO_GAME_TIME never lock and are left out of lock_epochs.
+    """
+
+    def __init__(self, lock_times, ids=None):
+        """
+        :param lock_times: Lock epoch of every player (int, NO_GAME_TIME when unknown).
+        :param ids: Optional player ids in the same order, enabling lookups by id.
+        """
+        lock_times = np.asarray(lock_times, dtype=np.int64)
+        self.lock_times = lock_times
+        self.order = np.argsort(lock_times, kind="stable")
+        sorted_times = lock_times[self.order]
+        epochs = np.unique(sorted_times)
+        self.lock_epochs = epochs[epochs != NO_GAME_TIME]
+        self.starts = np.searchsorted(sorted_times, self.lock_epochs, side="left")
+        # One past the last locking player; starts[k] for k == len(lock_epochs)
+        self.starts = np.append(self.starts, np.searchsorted(sorted_times, NO_GAME_TIME, side="left"))
+        self._epoch_list = self.lock_epochs.tolist()
+        self.index_of = {player_id: row for row, player_id in enumerate(ids)} if ids is not None else {}
+        self._mask_cache = (None, None)
+
+    def __len__(self):
+        return len(self.lock_times)
+
+    def _locked_count(self, now_ts):
+        """Number of players locked at now_ts (a player locks at its lock epoch)."""
+        passed = bisect_right(self._epoch_list, now_ts)
+        return int(self.starts[passed]) if passed else 0
+
+    def locked_indices(self, now_ts):
+        """
+        :param now_ts: Time as a Unix epoch.
+        :return: Rows of the players locked at now_ts, ordered by lock time.
+        """
+        return self.order[:self._locked_count(now_ts)]
+
+    def locked_mask(self, now_ts):
+        """
+        :param now_ts: Time as a Unix epoch.
+        :return: Boolean mask of the players locked at now_ts. The mask only changes when
+                 a lock epoch passes, so it is cached and must not be modified.
+        """
+        count = self._locked_count(now_ts)
+        cached_count, mask = self._mask_cache
+        if cached_count != count:
+            mask = np.zeros(len(self.lock_times), dtype=bool)
+            mask[self.order[:count]] = True
+            mask.flags.writeable = False
+            self._mask_cache = (count, mask)
+        return mask
+
+    def is_locked(self, player_id, now_ts):
+        """
+        :param player_id: Player id (requires the timeline to be built with ids).
+        :param now_ts: Time as a Unix epoch.
+        :return: True if the player's game has locked; unknown ids never lock.
+        """
+        row = self.index_of.get(player_id)
+        return row is not None and now_ts >= self.lock_times[row]
+
+    def rows_for(self, player_ids):
+        """
+        :param player_ids: Array of player ids (any shape); missing ids ('' or unknown) map to -1.
+        :return: Integer array of timeline rows with the same shape.
+        """
+        player_ids = np.asarray(player_ids, dtype=object)
+        return np.fromiter(
+            (self.index_of.get(player_id, -1) for player_id in player_ids.ravel()),
+            dtype=np.int64,
+            count=player_ids.size,
+        ).reshape(player_ids.shape)
+
+    def next_locks(self, now_ts, count=None):
+        """
+        List the lock events after now_ts.
+        :param now_ts: Time as a Unix epoch.
+        :param count: Maximum number of events (default: all remaining).
+        :return: List of (lock epoch, rows of the players locking then) tuples.
+        """
+        first = bisect_right(self._epoch_list, now_ts)
+        last = len(self._epoch_list) if count is None else min(first + count, len(self._epoch_list))
+        return [
+            (self._epoch_list[k], self.order[self.starts[k]:self.starts[k + 1]])
+            for k in range(first, last)
+        ]
@@ -0,0 +1,119 @@
+import difflib
+from utils.utils import normalize_name
+
+
+class NameResolver:
+    """
+    Resolve (name, team) pairs from projection sources to Player objects.
+
+    Lookups try, in order: the exact normalized name, a known alias, and finally a fuzzy
+    match against the players of the same team only. A fuzzy match must be the single
+    best candidate, and resolve_all leaves out players that another row of the same file
+    already matched exactly, so similar names on one team (Jalen / Jaylin Williams) never
+    take each other's rows. Fuzzy matches are remembered as aliases so the next lookup of
+    the same name is a dictionary hit; the ones found since the last pop_new_aliases()
+    call are the aliases worth persisting.
+    """
+
+    def __init__(self, aliases=None, cutoff=0.85):
+        """
+        :param aliases: Dict of (alias, team) -> player name; team None applies to every team.
+        :param cutoff: Minimum difflib similarity ratio for a fuzzy match.
+        """
+        self.cutoff = cutoff
+        self.index = {}  # (normalized name, team) -> Player
+        self.team_names = {}  # team -> normalized names of its players
+        self.aliases = {}  # (normalized alias, team) -> normalized name
+        self.new_aliases = {}
+        self._candidates = {}  # (normalized name, team) -> fuzzy candidates, see _fuzzy_candidates
+        if aliases:
+            self.add_aliases(aliases)
+
+    def add_player(self, player):
+        key = normalize_name(player.name)
+        self.index[(key, player.team)] = player
+        self.team_names.setdefault(player.team, []).append(key)
+        self._candidates.clear()
+
+    def add_aliases(self, aliases):
+        """
+        :param aliases: Dict of (alias, team) -> player name, raw or normalized.
+        """
+        for (alias, team), name in aliases.items():
+            self.aliases[(normalize_name(alias), team)] = normalize_name(name)
+
+    def resolve(self, name, team):
+        """
+        :param name: Player name as written in the source file.
+        :param team: Team abbreviation as written in the source file.
+        :return: The matching Player, or None.
+        """
+        return self.resolve_all([name], [team])[0]
+
+    def resolve_all(self, names, teams):
+        """
+        Resolve the rows of one source file. Exact and alias matches are made first; the
+        remaining rows are fuzzy matched only against players no other row claimed.
+        :param names: Player names as written in the file.
+        :param teams: Team abbreviations in the same order.
+        :return: List with the matching Player (or None) of every row.
+        """
+        keys = [normalize_name(name) for name in names]
+        players = [self._lookup(key, team) for key, team in zip(keys, teams)]
+        claimed = {(normalize_name(player.name), player.team) for player in players if player is not None}
+        for i, (key, team) in enumerate(zip(keys, teams)):
+            if players[i] is None:
+                players[i] = self._fuzzy_match(key, team, claimed)
+                if players[i] is not None:
+                    claimed.add((normalize_name(players[i].name), team))
+        return players
+
+    def _lookup(self, key, team):
+        """Exact or alias match of a normalized name."""
+        player = self.index.get((key, team))
+        if player is not None:
+            return player
+        alias = self.aliases.get((key, team)) or self.aliases.get((key, None))
+        if alias is not None:
+            return self.index.get((alias, team))
+        return None
+
+    def _fuzzy_candidates(self, key, team):
+        """
+        Same-team names within the cutoff, as (similarity, name) pairs, best first.
+        Fuzzy matching only compares against the dozen or so players of the same team.
+        """
+        if (key, team) not in self._candidates:
+            matcher = difflib.SequenceMatcher()
+            matcher.set_seq2(key)
+            candidates = []
+            for name in self.team_names.get(team, ()):
+                matcher.set_seq1(name)
+                if matcher.real_quick_ratio() >= self.cutoff and matcher.quick_ratio() >= self.cutoff:
+                    ratio = matcher.ratio()
+                    if ratio >= self.cutoff:
+                        candidates.append((ratio, name))
+            self._candidates[(key, team)] = sorted(candidates, reverse=True)
+        return self._candidates[(key, team)]
+
+    def _fuzzy_match(self, key, team, claimed):
+        candidates = [
+            (ratio, name) for ratio, name in self._fuzzy_candidates(key, team) if (name, team) not in claimed
+        ]
+        if not candidates:
+            return None
+        if len(candidates) > 1 and candidates[1][0] == candidates[0][0]:
+            print(f"Ambiguous name '{key}' ({team}): {', '.join(name for _, name in candidates)}")
+            return None
+
+        match = candidates[0][1]
+        self.aliases[(key, team)] = match
+        self.new_aliases[(key, team)] = match
+        return self.index[(match, team)]
+
+    def pop_new_aliases(self):
+        """
+        :return: Aliases found by fuzzy matching since the last call.
+        """
+        new_aliases, self.new_aliases = self.new_aliases, {}
+        return new_aliases
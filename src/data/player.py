@@ -1,11 +1,26 @@
-from datetime import datetime
+import time
 import pytz
 
+# Shared timezones; building these per player or per lock check is expensive
+EASTERN = pytz.timezone("US/Eastern")
+CENTRAL = pytz.timezone("US/Central")
+
+# Lock timestamp for players without a game time (they never lock)
+NO_LOCK_TS = float("inf")
+
+
 class Player:
-    def __init__(self, name, team, id, gametime, salary):
+    __slots__ = (
+        "id", "name", "team", "matchup", "position", "salary", "fpts", "minutes",
+        "ceiling", "stddev", "variance_score", "boom_pct", "bust_pct", "ownership",
+        "_gametime", "lock_ts", "std_minutes", "std_boom_pct", "std_ownership",
+    )
+
+    def __init__(self, name, team, id, gametime, salary, matchup=None):
         self.id = id
         self.name = name
         self.team = team
+        self.matchup = matchup
         self.position = []
         self.salary = salary
         self.fpts = 0
@@ -18,11 +33,24 @@ class Player:
         self.boom_pct = 0
         self.bust_pct = 0
         self.ownership = 0
-        self.gametime = gametime  
+        self.gametime = gametime
         self.std_minutes = 0
         self.std_boom_pct = 0
         self.std_ownership = 0
-        self.eastern = pytz.timezone("US/Eastern")
+
+    # Players are compared and hashed by identity; lineups and LP variable keys rely on it
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    @property
+    def gametime(self):
+        return self._gametime
+
+    @gametime.setter
+    def gametime(self, gametime):
+        """Keep the epoch lock timestamp in sync with the game time."""
+        self._gametime = gametime
+        self.lock_ts = gametime.timestamp() if gametime is not None else NO_LOCK_TS
 
     def __str__(self):
         return (
@@ -31,23 +59,19 @@ class Player:
             f"gametime={self.gametime}, ceiling={self.ceiling}, stddev={self.stddev}, boom_pct={self.boom_pct}, "
             f"bust_pct={self.bust_pct}, ownership={self.ownership}, id={self.id})"
         )
-    
-    def is_game_locked(self):
+
+    def is_game_locked(self, now_ts=None):
         """
-        Check if the current time is past the player's lock time in Eastern Time.
+        Check if the current time is past the player's lock time.
+        :param now_ts: Current time as a Unix epoch timestamp. Pass one snapshot
+                       when checking many players; defaults to time.time().
         :return: True if the game is locked, otherwise False.
         """
-        # Get the current time in Central Time
-        central_time = pytz.timezone("US/Central").localize(datetime.now())
-        # central_time = datetime(2025,1,7,19,22)
-        
-        # Convert Central Time to Eastern Time
-        eastern_time = central_time.astimezone(pytz.timezone("US/Eastern"))
-        
-        return eastern_time >= self.gametime
+        if now_ts is None:
+            now_ts = time.time()
+        return now_ts >= self.lock_ts
 
 
 
     def __repr__(self):
         return self.__str__()
-
@@ -0,0 +1,126 @@
+import numpy as np
+from data.lock_timeline import LockTimeline
+from utils.utils import NO_GAME_TIME
+
+
+# Bit assigned to each roster position in PlayerTable.position_bits
+POSITION_BITS = {"PG": 1, "SG": 2, "SF": 4, "PF": 8, "C": 16, "G": 32, "F": 64, "UTIL": 128}
+
+# Lock time used for players without a parsed game time (they never lock)
+NO_LOCK_TIME = NO_GAME_TIME
+
+
+class PlayerTable:
+    """
+    Struct-of-arrays view of a player pool.
+
+    Row i of every array describes self.players[i], so the optimizer, constraints
+    and metrics can build coefficients and scores with NumPy instead of reading
+    Player attributes one at a time.
+    """
+
+    def __init__(self, players):
+        self.players = list(players)
+        self.index_of = {player.id: row for row, player in enumerate(self.players)}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuild every column from the current Player attributes.
+        Call this after the Player objects have been modified.
+        """
+        players = self.players
+        count = len(players)
+
+        self.ids = np.array([player.id for player in players], dtype=object)
+        self.names = np.array([player.name for player in players], dtype=object)
+        self.salary = np.fromiter((player.salary for player in players), dtype=np.int64, count=count)
+        self.fpts = np.fromiter((player.fpts for player in players), dtype=np.float64, count=count)
+        self.minutes = np.fromiter((player.minutes for player in players), dtype=np.float64, count=count)
+        self.ceiling = np.fromiter((player.ceiling for player in players), dtype=np.float64, count=count)
+        self.boom_pct = np.fromiter((player.boom_pct for player in players), dtype=np.float64, count=count)
+        self.bust_pct = np.fromiter((player.bust_pct for player in players), dtype=np.float64, count=count)
+        self.ownership = np.fromiter((player.ownership for player in players), dtype=np.float64, count=count)
+        self.stddev = np.fromiter((player.stddev for player in players), dtype=np.float64, count=count)
+        self.lock_time = np.fromiter(
+            (int(player.lock_ts) if player.gametime is not None else NO_LOCK_TIME for player in players),
+            dtype=np.int64,
+            count=count,
+        )
+        self.lock_timeline = LockTimeline(self.lock_time, self.ids)
+        self.position_bits = np.fromiter(
+            (sum(POSITION_BITS[pos] for pos in set(player.position)) for player in players),
+            dtype=np.int64,
+            count=count,
+        )
+
+        # Teams and games are stored as integer codes into the sorted label lists
+        teams, self.team_code = np.unique(
+            np.array([player.team for player in players], dtype=str), return_inverse=True
+        )
+        games, self.game_code = np.unique(
+            np.array([player.matchup or "" for player in players], dtype=str), return_inverse=True
+        )
+        self.teams = teams.tolist()
+        self.games = games.tolist()
+
+    def __len__(self):
+        return len(self.players)
+
+    def eligible(self, position):
+        """
+        :param position: Roster position (e.g. 'PG', 'G', 'UTIL').
+        :return: Boolean mask of players eligible for the position.
+        """
+        return (self.position_bits & POSITION_BITS[position]) != 0
+
+    def team_mask(self, team):
+        """
+        :param team: Team abbreviation.
+        :return: Boolean mask of players on the team (all False if the team is not in the pool).
+        """
+        if team not in self.teams:
+            return np.zeros(len(self), dtype=bool)
+        return self.team_code == self.teams.index(team)
+
+    def game_mask(self, game):
+        """
+        :param game: Matchup string (e.g. 'CLE@OKC').
+        :return: Boolean mask of players in the game (all False if the game is not in the pool).
+        """
+        if game not in self.games:
+            return np.zeros(len(self), dtype=bool)
+        return self.game_code == self.games.index(game)
+
+    def locked_mask(self, now_ts):
+        """
+        :param now_ts: Current time as a Unix epoch timestamp.
+        :return: Read-only boolean mask of players whose game has locked.
+        """
+        return self.lock_timeline.locked_mask(now_ts)
+
+    def rows_for(self, player_ids):
+        """
+        :param player_ids: Iterable of player ids.
+        :return: Integer array with the table row of each id.
+        """
+        return np.fromiter((self.index_of[player_id] for player_id in player_ids), dtype=np.int64)
+
+    def variable_layout(self, formulation="slot"):
+        """
+        Describe the (player, position) decision variables in creation order:
+        players in table order, positions in each player's position list order.
+        :param formulation: 'slot' for one variable per eligible position, or 'player' for
+                            one variable per player with any position (its position is None).
+        :return: Tuple of (row index array, list of positions), one entry per variable.
+        """
+        if formulation == "player":
+            rows = np.flatnonzero(self.position_bits != 0)
+            return rows.astype(np.int64), [None] * len(rows)
+        rows = []
+        positions = []
+        for row, player in enumerate(self.players):
+            for position in player.position:
+                rows.append(row)
+                positions.append(position)
+        return np.array(rows, dtype=np.int64), positions
@@ -0,0 +1,86 @@
+import csv
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional
+    pa = None
+    pa_csv = None
+
+try:
+    import pandas as pd
+except ImportError:  # pandas is optional for ingestion
+    pd = None
+
+
+CSV_BACKENDS = ("pyarrow", "pandas", "csv")
+
+
+def available_backend(backend="auto"):
+    """
+    Resolve the CSV reader backend to use.
+    :param backend: 'auto', 'pyarrow', 'pandas' or 'csv'. 'auto' picks the fastest installed one.
+    :return: Name of the backend that will be used.
+    """
+    installed = {"pyarrow": pa_csv is not None, "pandas": pd is not None, "csv": True}
+    if backend == "auto":
+        return next(name for name in CSV_BACKENDS if installed[name])
+    if backend not in installed:
+        raise ValueError(f"Unknown csv_backend '{backend}', expected one of {('auto',) + CSV_BACKENDS}")
+    if not installed[backend]:
+        print(f"csv_backend '{backend}' is not installed, falling back to csv.")
+        return "csv"
+    return backend
+
+
+def read_csv_columns(path, columns, backend="auto"):
+    """
+    Read selected columns of a CSV file as lists of strings.
+    :param path: Path of the CSV file (UTF-8, optionally with a BOM).
+    :param columns: Column names to read; a missing column raises KeyError, a row too
+                    short to hold them (e.g. a file caught mid-write) ValueError.
+    :param backend: Reader backend, see available_backend.
+    :return: Dict of column name -> list of cell strings.
+    """
+    backend = available_backend(backend)
+
+    if backend == "pyarrow":
+        table = pa_csv.read_csv(
+            path,
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=list(columns),
+                column_types={column: pa.string() for column in columns},
+                strings_can_be_null=False,
+            ),
+        )
+        missing = set(columns) - set(table.column_names)
+        if missing:
+            raise KeyError(f"Missing columns {missing} in {path}")
+        return {column: table.column(column).to_pylist() for column in columns}
+
+    if backend == "pandas":
+        frame = pd.read_csv(
+            path, usecols=list(columns), dtype=str, keep_default_na=False, encoding="utf-8-sig", engine="c"
+        )
+        return {column: frame[column].tolist() for column in columns}
+
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        indexes = [header.index(column) if column in header else None for column in columns]
+        missing = [column for column, index in zip(columns, indexes) if index is None]
+        if missing:
+            raise KeyError(f"Missing columns {missing} in {path}")
+        rows = [row for row in reader if row]
+    width = max(indexes) + 1
+    if any(len(row) < width for row in rows):
+        raise ValueError(f"Rows with fewer than {width} fields in {path}")
+    return {column: [row[index] for row in rows] for column, index in zip(columns, indexes)}
+
+
+def to_float_array(values):
+    """
+    Convert a column of numeric strings (thousands separators allowed) to a float64 array.
+    """
+    return np.array([value.replace(",", "") for value in values], dtype=np.float64)
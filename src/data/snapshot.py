@@ -0,0 +1,71 @@
+import os
+import json
+import glob
+import pickle
+import hashlib
+from utils.config import json_default
+
+
+# Bump whenever the pickled payload or the Player layout changes
+SNAPSHOT_VERSION = 3
+SNAPSHOT_SUFFIX = ".slate.pkl"
+
+
+def compute_snapshot_key(paths, config):
+    """
+    Hash the contents of the slate input files together with the config.
+    :param paths: Absolute paths of the input CSV files, in a fixed order.
+    :param config: Configuration dictionary used to load the slate.
+    :return: Hex digest identifying this exact set of inputs.
+    """
+    digest = hashlib.sha256(f"v{SNAPSHOT_VERSION}".encode())
+    for path in paths:
+        with open(path, "rb") as file:
+            digest.update(hashlib.sha256(file.read()).digest())
+    digest.update(json.dumps(config, sort_keys=True, default=json_default).encode())
+    return digest.hexdigest()
+
+
+def _snapshot_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}{SNAPSHOT_SUFFIX}")
+
+
+def load_snapshot(cache_dir, key):
+    """
+    Load a cached slate snapshot.
+    :param cache_dir: Directory holding the snapshot files.
+    :param key: Key returned by compute_snapshot_key.
+    :return: The cached payload, or None if there is no usable snapshot.
+    """
+    path = _snapshot_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as file:
+            payload = pickle.load(file)
+    except Exception as e:
+        print(f"Ignoring unreadable slate snapshot {path}: {e}")
+        return None
+    if payload.get("version") != SNAPSHOT_VERSION:
+        return None
+    return payload
+
+
+def save_snapshot(cache_dir, key, payload, keep=8):
+    """
+    Save a slate snapshot and prune the oldest ones beyond `keep`.
+    :param cache_dir: Directory holding the snapshot files.
+    :param key: Key returned by compute_snapshot_key.
+    :param payload: Picklable dictionary with the loaded slate.
+    :param keep: Number of most recent snapshots to keep.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _snapshot_path(cache_dir, key)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        pickle.dump(dict(payload, version=SNAPSHOT_VERSION), file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    snapshots = sorted(glob.glob(os.path.join(cache_dir, f"*{SNAPSHOT_SUFFIX}")), key=os.path.getmtime)
+    for stale in snapshots[:-keep]:
+        os.remove(stale)
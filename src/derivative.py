@@ -4,6 +4,7 @@ from optimizer.optimizer import Optimizer
 from lineups.lineups import Lineups
 from lineups.lineup_metrics import calculate_exposure
 from optimizer.late_swaptimizer import LateSwaptimizer
+from optimizer.presolve import presolve_players, FRONTIER_TERMS
 import pandas as pd
 
 ### Entry point of the application
@@ -41,6 +42,10 @@ def main():
         player for player in data_manager.players
         if player.fpts > data_manager.config.get("projection_minimum")
     ]
+    if data_manager.config.presolve:
+        players = presolve_players(
+            site, players, data_manager.build_player_table(players), data_manager.config, FRONTIER_TERMS
+        )
 
     num_lineups = 1
     num_uniques = 1
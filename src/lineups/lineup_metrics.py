@@ -1,45 +1,45 @@
 import pandas as pd
+import numpy as np
+from data.player_table import PlayerTable
 
-def calculate_exposure(lineups, players):
+def calculate_exposure(lineups, players, player_table=None):
     """
     Calculate player exposure in the given lineups and return a sorted DataFrame.
 
     :param lineups: List of lineups, where each lineup is a list of (player, position, player.id) tuples.
     :param players: List of all Player objects used in the lineups.
+    :param player_table: Optional PlayerTable built from the same players.
     :return: Pandas DataFrame sorted by exposure percentage, highest to lowest.
     """
-    # Initialize a dictionary to track exposures
-    exposure_count = {player.id: 0 for player in players}
+    table = player_table if player_table is not None else PlayerTable(players)
     total_lineups = len(lineups)
 
     # Count the occurrences of each player in the lineups
-    for lineup in lineups:
-        for player_tuple in lineup:
-            if isinstance(player_tuple[0], type(players[0])):  # Check if it's a Player object
-                player_id = player_tuple[2]  # Extract `player.id` from the tuple
-                exposure_count[player_id] += 1
+    rows = [
+        table.index_of[player_tuple[2]]
+        for lineup in lineups
+        for player_tuple in lineup
+        if player_tuple[2] in table.index_of
+    ]
+    exposure_count = np.bincount(np.array(rows, dtype=np.int64), minlength=len(table))
+    exposure = exposure_count / total_lineups * 100
 
     # Create a DataFrame with player data
-    data = []
-    for player in players:
-        exposure = (exposure_count[player.id] / total_lineups) * 100
-        data.append({
-            "Name": player.name,
-            "Team": player.team,
-            "Salary": player.salary,
-            "Exposure (%)": exposure,
-            "Minutes": player.minutes,
-            "Ownership": player.ownership,
-            "Leverage": exposure - player.ownership,
-            "FPTS": player.fpts,
-            "Value": player.fpts / player.salary * 1000,
-            "STDDEV": player.stddev,
-            "Boom": player.boom_pct,
-            "Bust": player.bust_pct,
-        })
+    df = pd.DataFrame({
+        "Name": table.names,
+        "Team": np.array(table.teams, dtype=object)[table.team_code],
+        "Salary": table.salary,
+        "Exposure (%)": exposure,
+        "Minutes": table.minutes,
+        "Ownership": table.ownership,
+        "Leverage": exposure - table.ownership,
+        "FPTS": table.fpts,
+        "Value": table.fpts / table.salary * 1000,
+        "STDDEV": table.stddev,
+        "Boom": table.boom_pct,
+        "Bust": table.bust_pct,
+    })
 
-    # Create and sort the DataFrame
-    df = pd.DataFrame(data)
+    # Sort the DataFrame
     df.sort_values(by="Exposure (%)", ascending=False, inplace=True)
     return df
-
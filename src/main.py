@@ -1,36 +1,47 @@
 import os
-from data.data_manager import DataManager
-from optimizer.optimizer import Optimizer
-from lineups.lineups import Lineups
+import argparse
 from lineups.lineup_metrics import calculate_exposure
-from optimizer.late_swaptimizer import LateSwaptimizer
 import pandas as pd
-from data.database import initialize_database, write_players_to_database
-import pulp
+from data.database import write_player_snapshot, write_lineup_run
+from data.db_writer import get_writer, close_writers
+from session import SlateSession
+from utils.config import get_project_root
 
-### Entry point of the application
-
-def main():
-    pd.set_option('display.max_rows', None)
-    pd.set_option('display.max_columns', None)
-    pd.set_option('display.width', None)
-    pd.set_option('display.max_colwidth', None)
+# Slate name used when no --slate is given; its output files keep their original names
+DEFAULT_SLATE = "main"
 
-    initialize_database()
-    # Initialize DataManager for the desired site (e.g., 'dk')
-    site = "dk"  # Or "fd" depending on the use case
-    process = 'swap'
-
-
-    data_manager = DataManager(site)
+### Entry point of the application
 
-    # Load player data
-    try:
-        data_manager.load_player_data()
-        print("Player data loaded successfully.")
-    except FileNotFoundError as e:
-        print(f"Error: {e}")
-        return
+def parse_args():
+    parser = argparse.ArgumentParser(description="NBA DFS lineup optimizer")
+    parser.add_argument("--site", default="dk", help="Site to optimize for: dk or fd")
+    parser.add_argument("--process", default="swap", choices=["main", "swap"],
+                        help="'main' builds lineups for every contest style, 'swap' runs late swap")
+    parser.add_argument("--slate", action="append", default=[], metavar="NAME[=CONFIG_PATH]",
+                        help="Slate to run; repeat to run several slates in one process. "
+                             "CONFIG_PATH is relative to the project root (default: the site config).")
+    return parser.parse_args()
+
+
+def record_player_snapshot(players, site, slate, input_hash, conn):
+    """
+    Database job saving the slate's player snapshot.
+    :return: Id of the snapshot.
+    """
+    snapshot_id, changed = write_player_snapshot(players, site, slate, input_hash, conn)
+    print(f"Player data saved to the database (snapshot {snapshot_id}, {changed} players changed).")
+    return snapshot_id
+
+
+def run_slate(session, slate, process):
+    """
+    Run the main build or late swap for one slate of the session.
+    :param session: SlateSession holding the slate.
+    :param slate: Name of the slate.
+    :param process: 'main' or 'swap'.
+    """
+    data_manager = session.data_manager(slate)
+    site = data_manager.site
 
     # Filter out invalid players and capture removed players
     removed_players = [
@@ -41,16 +52,19 @@ def main():
     for player in removed_players:
         print(f"Name: {player.name}, Ownership: {player.ownership}, ID: {player.id}")
 
-    players = [
-        player for player in data_manager.players
-        if player.fpts > data_manager.config.get("projection_minimum")
-    ]
+    players, player_table, _ = session.player_pool(slate)
 
-    write_players_to_database(players)
-    print("Player data saved to the database.")
+    # Database writes run on the writer thread; optimization does not wait for them
+    writer = get_writer(data_manager.config.db_path)
+    snapshot_id = writer.submit(
+        record_player_snapshot, data_manager.players, site, slate, data_manager.snapshot_key
+    )
 
     ### up to this point, the optimization process is the exact same, assuming that the projections, boom_bust, and player_ids are all the same format. 
 
+    output_dir = os.path.join(get_project_root(), data_manager.config.get("output_path", "data/output"))
+    prefix = "" if slate == DEFAULT_SLATE else f"{slate}_"
+
     # Initialize the optimizer
     if process == 'main':
         contest_params_dict = data_manager.config.get("contest_params", {})
@@ -60,37 +74,40 @@ def main():
 
             num_lineups = c_params.get("num_lineups", 5)
             num_uniques = c_params.get("num_uniques", 1)
-            data_manager.config["ceiling_weight"] = c_params.get("ceiling_weight", 3)
-            data_manager.config["ownership_weight"] = c_params.get("ownership_weight", 1)
-            data_manager.config["max_ownership_sum"] = c_params.get("max_ownership_sum", 999)
-            data_manager.config["min_fpts"] = c_params.get("min_fpts", 0)
-            data_manager.config["randomness_amount"] = c_params.get("randomness_amount", 0)
-
-            optimizer = Optimizer(
-                    site=site,
-                    players=players,
-                    num_lineups=num_lineups,
-                    num_uniques=num_uniques,
-                    config=data_manager.config
-                )
+            # Contest settings are layered over the slate config; the shared config is never mutated
+            contest_config = data_manager.config.overlay(
+                ceiling_weight=c_params.get("ceiling_weight", 3),
+                ownership_weight=c_params.get("ownership_weight", 1),
+                max_ownership_sum=c_params.get("max_ownership_sum", 999),
+                min_fpts=c_params.get("min_fpts", 0),
+                randomness_amount=c_params.get("randomness_amount", 0),
+            )
+
+            optimizer = session.optimizer(slate, num_lineups, num_uniques, contest_config)
             # Generate lineups
             lineups = optimizer.run()
 
             # Print exposures or any other info
-            exposure_df = calculate_exposure(lineups.lineups, players)
+            exposure_df = calculate_exposure(lineups.lineups, players, player_table)
             print(exposure_df)
 
             # Optionally, export to a unique file for each contest type
-            filename = f"C:/Users/samba/nba_dfs/data/output/optimal_lineups_{contest_style}.csv"
+            filename = os.path.join(output_dir, f"optimal_lineups_{prefix}{contest_style}.csv")
             lineups.export_to_csv(filename, site=optimizer.site)
+            writer.submit(
+                write_lineup_run, lineups, site, slate, "main", contest_style, contest_config.fingerprint(), snapshot_id
+            )
 
     else :
-        data_manager.populate_ids_to_gametime()
         data_manager.load_player_lineups(data_manager.config['late_swap_path'])
-        late_swap = LateSwaptimizer(site, players, data_manager.config, data_manager.lineups)
-        lineups = late_swap.run(output_csv_path="C:/Users/samba/nba_dfs/data/output/swapped_lineups.csv")
-
-        exposure_df = calculate_exposure(lineups.lineups, players)
+        late_swap = session.late_swaptimizer(slate, data_manager.lineups)
+        lineups = late_swap.run(output_csv_path=os.path.join(output_dir, f"{prefix}swapped_lineups.csv"))
+        writer.submit(
+            write_lineup_run, lineups, site, slate, "swap",
+            config_hash=data_manager.config.fingerprint(), snapshot_id=snapshot_id,
+        )
+
+        exposure_df = calculate_exposure(lineups.lineups, players, player_table)
         print(exposure_df)
 
         # for lineup in data_manager.lineups:
@@ -98,6 +115,34 @@ def main():
             ### {'entry_id': '4561617468', 'contest_id': '171700955', 'contest_name': 'DFS Hero - Friday Night Hoops by Momar89', 'PG': 'Vasilije Micic (37001127)', 'SG': 'Brandon Miller (37000948)', 'SF': 'Justin Champagnie (37001198) (LOCKED)', 'PF': 'Miles Bridges (37001074)', 'C': 'Jalen Smith (37001372)', 'G': 'Kevin Porter Jr. (37001233)', 'F': 'Bilal Coulibaly (37001115) (LOCKED)', 'UTIL': 'Nikola Jokic (37000929)', 'PG_is_locked': False, 'SG_is_locked': False, 'SF_is_locked': True, 'PF_is_locked': False, 'C_is_locked': False, 'G_is_locked': False, 'F_is_locked': True, 'UTIL_is_locked': False}
 
 
+def main():
+    pd.set_option('display.max_rows', None)
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', None)
+    pd.set_option('display.max_colwidth', None)
+
+    args = parse_args()
+
+    # Load every requested slate into one session so parsed data and model structures stay warm
+    session = SlateSession()
+    slates = args.slate or [DEFAULT_SLATE]
+    for slate_arg in slates:
+        slate, _, config_path = slate_arg.partition("=")
+        try:
+            session.add_slate(slate, args.site, config_path or None)
+            print(f"Player data for slate '{slate}' loaded successfully.")
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            return
+
+    for slate in session.slates:
+        print(f"\n##### Slate: {slate} #####")
+        run_slate(session, slate, args.process)
+
+    # Wait for the queued database writes before exiting
+    close_writers()
+
+
 
 
 if __name__ == "__main__":
@@ -111,7 +156,6 @@ if __name__ == "__main__":
 #TODO: boost for player's ceilings who are starting? seems like stok projects the starters for less min in uncertain spots. 
 #TODO: clean up logic of derivative for finding optimal limit. it's fine currently, but could be better. 
 #TODO: better way to dial in ownership max constraint. Right now, can use it to avoid being super chalky, but that's about it. 
-#TODO: redundant config definition in the loop. 
 
 #------TEST------#
 #TODO: complexify lateswap with the same parameters as prelock
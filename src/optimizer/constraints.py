@@ -1,56 +1,147 @@
-from pulp import lpSum
+from pulp import lpSum, LpAffineExpression
+import numpy as np
+import json
+from data.player_table import PlayerTable
+from utils.config import json_default
+from optimizer.slots import position_limits, slot_masks, hall_groups
+
+
+# Salary cap per site
+MAX_SALARY = {"dk": 50000, "fd": 60000}
+
+
+def salary_limits(site, config):
+    """
+    :return: (minimum, maximum) lineup salary of a site. DraftKings takes the minimum from
+             min_lineup_salary, FanDuel requires 59000.
+    """
+    if site == "dk":
+        return config.get("min_lineup_salary"), MAX_SALARY["dk"]
+    return 59000, MAX_SALARY["fd"]
+
+
+def weighted_sum(variables, coefficients):
+    """
+    Build sum(coefficient * variable) in one step instead of through lpSum generators.
+    :param variables: Sequence of LP variables.
+    :param coefficients: Array of coefficients, one per variable.
+    :return: LpAffineExpression.
+    """
+    return LpAffineExpression(list(zip(variables, np.asarray(coefficients).tolist())))
+
+
+def static_constraint_key(site, config):
+    """
+    Key identifying the static constraints built for a site and config, so compiled
+    constraints can be cached and reused while these settings stay the same.
+    """
+    settings = {
+        key: config.get(key)
+        for key in ("min_lineup_salary", "max_team_salary", "matchup_limits", "team_limits", "formulation")
+    }
+    return site, json.dumps(settings, sort_keys=True, default=json_default)
+
+
+class _ConstraintRecorder:
+    """Stands in for an LpProblem and records the (constraint, name) pairs added to it."""
+
+    def __init__(self):
+        self.constraints = []
+
+    def __iadd__(self, other):
+        self.constraints.append(other)
+        return self
 
 
 class ConstraintManager:
-    def __init__(self, site, problem, players, lp_variables, config):
+    def __init__(self, site, problem, players, lp_variables, config, player_table=None):
         self.site = site
         self.problem = problem
         self.players = players
         self.lp_variables = lp_variables
         self.config = config
+        self.player_table = player_table if player_table is not None else PlayerTable(players)
 
-    def add_salary_constraints(self):
-        max_salary = 50000 if self.site == "dk" else 60000
-        min_salary = self.config.get("min_lineup_salary") if self.site == "dk" else 59000
+        # One entry per (player, position) variable: its table row, position and LP variable
+        self.formulation = config.formulation
+        self.var_rows, self.var_positions = self.player_table.variable_layout(self.formulation)
+        self.var_list = [
+            lp_variables[(self.player_table.players[row], position)]
+            for row, position in zip(self.var_rows, self.var_positions)
+        ]
+
+    def _sum_over(self, player_values, var_mask=None):
+        """
+        Sum of player_values[player] * x[player, position] over the variables in var_mask.
+        :param player_values: Array with one value per table row.
+        :param var_mask: Boolean mask over variables (default: all variables).
+        """
+        coefficients = np.asarray(player_values)[self.var_rows]
+        if var_mask is None:
+            return weighted_sum(self.var_list, coefficients)
+        selected = np.flatnonzero(var_mask)
+        return weighted_sum([self.var_list[i] for i in selected], coefficients[selected])
 
-        self.problem += lpSum(
-            player.salary * self.lp_variables[(player, position)]
-            for player in self.players
-            for position in player.position
-        ) <= max_salary, "Max_Salary"
+    def add_salary_constraints(self):
+        min_salary, max_salary = salary_limits(self.site, self.config)
 
-        self.problem += lpSum(
-            player.salary * self.lp_variables[(player, position)]
-            for player in self.players
-            for position in player.position
-        ) >= min_salary, "Min_Salary"
+        lineup_salary = self._sum_over(self.player_table.salary)
+        self.problem += lineup_salary <= max_salary, "Max_Salary"
+        self.problem += lineup_salary >= min_salary, "Min_Salary"
 
     def add_position_constraints(self):
-        # Hard-coded position constraints
-        if self.site == "dk":
-            position_limits = {
-                "PG": 1, "SG": 1, "SF": 1, "PF": 1, "C": 1, "G": 1, "F": 1, "UTIL": 1
-            }
-        else:  # Assuming "fd"
-            position_limits = {
-                "PG": 2, "SG": 2, "SF": 2, "PF": 2, "C": 1
-            }
-
-        for pos, limit in position_limits.items():
-            eligible = [(player, pos) for player in self.players if pos in player.position]
-            self.problem += lpSum(self.lp_variables[key] for key in eligible) == limit, f"Position_{pos}"
+        if self.formulation == "player":
+            self.add_slot_constraints()
+            return
+
+        ones = np.ones(len(self.player_table))
+        var_positions = np.array(self.var_positions, dtype=object)
+        for pos, limit in position_limits(self.site).items():
+            self.problem += self._sum_over(ones, var_positions == pos) == limit, f"Position_{pos}"
+
+    def add_slot_constraints(self, fixed_slots=None):
+        """
+        Roster constraints of the player-level formulation (one variable per player): the
+        lineup has roster size players and passes the Hall counting constraints, so its
+        players can be matched to the slots after the solve (see slots.assign_lineup_slots).
+        :param fixed_slots: Optional dict of table row -> slot for players that must keep
+                            their slot (locked players). Their slots are taken out and the
+                            constraints then cover the remaining players and slots.
+        """
+        fixed_slots = fixed_slots or {}
+        limits = dict(position_limits(self.site))
+        for slot in fixed_slots.values():
+            limits[slot] -= 1
+        slots = list(limits)
+        capacities = list(limits.values())
+        open_slots = sum(1 << index for index, capacity in enumerate(capacities) if capacity > 0)
+
+        ones = np.ones(len(self.player_table))
+        masks = slot_masks(self.player_table.position_bits, slots) & open_slots
+        free = np.ones(len(self.player_table), dtype=bool)
+        free[list(fixed_slots)] = False
+        var_free = free[self.var_rows]
+        suffix = "_Open" if fixed_slots else ""
+
+        self.problem += self._sum_over(ones, var_free) == sum(capacities), f"Roster_Size{suffix}"
+        var_masks = masks[self.var_rows]
+        for union, capacity in hall_groups(masks[free], capacities):
+            in_group = var_free & (var_masks & ~union == 0)
+            if in_group.any():
+                group = "_".join(slot for index, slot in enumerate(slots) if union >> index & 1) or "None"
+                self.problem += self._sum_over(ones, in_group) <= capacity, f"Slots_{group}{suffix}"
 
     def add_matchup_constraints(self):
         matchup_limits = self.config.get("matchup_limits", {})
         for matchup, limit in matchup_limits.items():
-            eligible = [(player, position) for player in self.players if player.matchup == matchup]
-            self.problem += lpSum(self.lp_variables[key] for key in eligible) <= limit, f"Matchup_{matchup}"
+            in_game = self.player_table.game_mask(matchup).astype(float)
+            self.problem += self._sum_over(in_game, in_game[self.var_rows] > 0) <= limit, f"Matchup_{matchup}"
 
     def add_team_constraints(self):
         team_limits = self.config.get("team_limits", {})
         for team, limit in team_limits.items():
-            eligible = [(player, position) for player in self.players if player.team == team]
-            self.problem += lpSum(self.lp_variables[key] for key in eligible) <= limit, f"Team_{team}"
+            on_team = self.player_table.team_mask(team).astype(float)
+            self.problem += self._sum_over(on_team, on_team[self.var_rows] > 0) <= limit, f"Team_{team}"
 
     def add_global_team_salary_limit(self):
         """
@@ -59,17 +150,12 @@ class ConstraintManager:
         """
         max_team_salary = self.config.get("max_team_salary")  # Global salary limit for any single team
         if max_team_salary:
+            var_team_codes = self.player_table.team_code[self.var_rows]
             # Iterate over unique teams
-            for team in set(player.team for player in self.players):
-                # Filter eligible players for the team
-                eligible = [
-                    (player, pos) for player in self.players for pos in player.position if player.team == team
-                ]
-
+            for code, team in enumerate(self.player_table.teams):
                 # Add a constraint to limit the total salary for players from this team
                 self.problem += (
-                    lpSum(player.salary * self.lp_variables[(player, pos)] for player, pos in eligible)
-                    <= max_team_salary,
+                    self._sum_over(self.player_table.salary, var_team_codes == code) <= max_team_salary,
                     f"Global_Team_Salary_Limit_{team}"
                 )
 
@@ -89,14 +175,19 @@ class ConstraintManager:
 
 
     def add_single_player_constraints(self):
-        for player in self.players:
-            self.problem += lpSum(
-                self.lp_variables[(player, position)] for position in player.position
-            ) <= 1, f"Single_Use_{player.name}"
+        if len(self.var_rows) == 0:
+            return
+        # Variables are laid out player by player, so each player's variables are contiguous
+        boundaries = np.flatnonzero(np.diff(self.var_rows)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(self.var_rows)]))
+        for start, end in zip(starts, ends):
+            player = self.player_table.players[self.var_rows[start]]
+            self.problem += weighted_sum(self.var_list[start:end], np.ones(end - start)) <= 1, f"Single_Use_{player.name}"
 
     def add_static_constraints(self):
         '''
-        This is used for static constraints for the site you are optimizing for (i.e. draftkings, nba). 
+        This is used for static constraints for the site you are optimizing for (i.e. draftkings, nba).
         '''
         self.add_salary_constraints()
         self.add_position_constraints()
@@ -105,6 +196,28 @@ class ConstraintManager:
         self.add_matchup_constraints()
         self.add_team_constraints()
 
+    def compile_static_constraints(self):
+        """
+        Build the static constraints without adding them to a problem.
+        The result can be added to any number of problems over the same LP variables.
+        :return: List of (constraint, name) pairs.
+        """
+        problem = self.problem
+        self.problem = recorder = _ConstraintRecorder()
+        try:
+            self.add_static_constraints()
+        finally:
+            self.problem = problem
+        return recorder.constraints
+
+    def add_compiled_constraints(self, compiled):
+        """
+        Add constraints produced by compile_static_constraints to the problem.
+        :param compiled: List of (constraint, name) pairs.
+        """
+        for constraint, name in compiled:
+            self.problem += constraint, name
+
     def add_lineup_pool_constraints(self, selected_lineups, num_uniques):
         '''
         This is used for looping constraints(i.e. exposure caps, uniqueness, etc.)
@@ -118,22 +231,13 @@ class ConstraintManager:
         :param min_fpts: Minimum required cumulative fpts.
         """
         if max_ownership is not None:
-            lineup_ownership = lpSum(
-                player.ownership * self.lp_variables[(player, position)]
-                for player in self.players
-                for position in player.position
-            )
+            lineup_ownership = self._sum_over(self.player_table.ownership)
             self.problem += lineup_ownership <= max_ownership, "Max_Ownership"
-        else: 
+        else:
             print('max_ownership is none')
 
         if min_fpts is not None:
-            lineup_fpts = lpSum(
-                player.fpts * self.lp_variables[(player, position)]
-                for player in self.players
-                for position in player.position
-            )
+            lineup_fpts = self._sum_over(self.player_table.fpts)
             self.problem += lineup_fpts >= min_fpts, "Min_FPTS"
-        else: 
+        else:
             print('min_fpts is none')
-
@@ -1,59 +1,85 @@
-from pulp import LpProblem, LpMaximize, lpSum, LpVariable, LpBinary
-from optimizer.constraints import ConstraintManager
+from pulp import LpProblem, LpMaximize
+from optimizer.constraints import ConstraintManager, weighted_sum, static_constraint_key
+from data.player_table import PlayerTable
+from data.entry_table import DK_SLOTS
 import numpy as np
 from lineups.lineups import Lineups
-import pulp as plp
-import re
-import pandas as pd
+from optimizer.solvers import get_solver, is_selected, set_start, takes_start
+from optimizer.objective import sample_values, scale_rows
+from optimizer.slots import assign_lineup_slots, variable_keys, cached_variables
+import csv
+import time
 
 
 class LateSwaptimizer:
-    def __init__(self, site, players, config, lineups):
+    def __init__(self, site, players, config, lineups, player_table=None, cache=None):
         self.site = site
         self.players = players
+        self.player_table = player_table if player_table is not None else PlayerTable(players)
         self.config = config
-        self.lineups = lineups  # Dictionary of input lineups
+        self.lineups = lineups  # EntryTable of input lineups
+        # Structures shared by optimizers over the same pool (see SlateSession)
+        self.cache = cache if cache is not None else {}
         self.problem = None
-        self.lp_variables = {}
         self.position_map = {i: ["PG", "SG", "SF", "PF", "C", "G", "F", "UTIL"] for i in range(len(players))}
 
-        # Create LP variables for each player and position
-        for player in players:
-            for position in player.position:
-                var_name = f"{player.name}_{position}_{player.id}"
-                self.lp_variables[(player, position)] = plp.LpVariable(
-                    name=var_name, cat=plp.LpBinary
-                )
+        # Settings read once instead of on every entry
+        self.fpts_buffer = config.get("fpts_buffer", 0.98)
+        self.max_ownership_sum = config.get("max_ownership_sum")
+        self.ceiling_weight = config.get("ceiling_weight")
+        self.ownership_weight = config.get("ownership_weight")
+        self.randomness_factor = config.get("randomness_amount", 10) / 100  # Example: 10% randomness
+        self.solver = get_solver(config.solver, warm_start=config.warm_start)
+        self.verbose_solver = get_solver(config.solver, msg=True, warm_start=config.warm_start)
+        # The entry roster start is only built when the resolved backend receives it
+        self.warm_start = takes_start(self.solver)
+        self.rng = np.random.default_rng(config.seed)
+
+        # Create LP variables for each player and position (or each player in the player-level
+        # formulation), in PlayerTable.variable_layout order
+        self.formulation = config.formulation
+        self.var_rows, self.var_positions, self.lp_variables = cached_variables(
+            self.cache, self.player_table, self.formulation
+        )
 
     def apply_locked_constraints(self, lineup):
         """
         Add constraints for locked players in the lineup.
         :param lineup: Dictionary representing a single lineup.
+        :return: Dict of table row -> slot of the locked players found in the pool.
         """
-        for position, locked_key in [
-            ("PG", "PG_is_locked"),
-            ("SG", "SG_is_locked"),
-            ("SF", "SF_is_locked"),
-            ("PF", "PF_is_locked"),
-            ("C", "C_is_locked"),
-            ("G", "G_is_locked"),
-            ("F", "F_is_locked"),
-            ("UTIL", "UTIL_is_locked"),
-        ]:
-            if lineup[locked_key]:  # If the player is locked
-                locked_player_id = re.search(r"\((\d+)\)", lineup[position]).group(1)
-                locked_player = next((p for p in self.players if p.id == locked_player_id), None)
+        fixed_slots = {}
+        for position in DK_SLOTS:
+            if lineup[f"{position}_is_locked"]:  # If the player is locked
+                locked_player_id = lineup[f"{position}_id"]
+                row = self.player_table.index_of.get(locked_player_id)
+                locked_player = self.player_table.players[row] if row is not None else None
 
                 # print(f"locked_player: {locked_player}")
 
                 if locked_player:
                     # Ensure this player is selected for the specified position
+                    key = variable_keys([(locked_player, position)], self.formulation)[0]
                     self.problem += (
-                        self.lp_variables[(locked_player, position)] == 1,
+                        self.lp_variables[key] == 1,
                         f"{position}_locked_constraint_{locked_player_id}",
                     )
+                    fixed_slots[row] = position
                 else:
                     print(f"Warning: Locked player ID {locked_player_id} not found.")
+        return fixed_slots
+
+    def _entry_roster(self, lineup):
+        """
+        Current roster of an entry as (player, slot) pairs, skipping players outside the pool.
+        :param lineup: Dictionary representing a single lineup.
+        """
+        roster = []
+        for slot in DK_SLOTS:
+            row = self.player_table.index_of.get(lineup[f"{slot}_id"])
+            if row is not None and (self.player_table.players[row], slot) in self.lp_variables:
+                roster.append((self.player_table.players[row], slot))
+        return roster
 
     def adjust_roster_for_late_swap(self, lineup):
         """
@@ -101,6 +127,18 @@ class LateSwaptimizer:
 
         return sorted_lineup
 
+    def _eligible_expression(self, player_values, eligible):
+        """
+        Build sum(player_values[player] * x[player, position]) over the eligible players only.
+        :param player_values: Array with one value per PlayerTable row.
+        :param eligible: Boolean mask of eligible PlayerTable rows.
+        """
+        var_eligible = eligible[self.var_rows]
+        return weighted_sum(
+            [var for var, keep in zip(self.lp_variables.values(), var_eligible) if keep],
+            np.asarray(player_values)[self.var_rows][var_eligible],
+        )
+
     def optimize_single_lineup(self, lineup):
         """
         Optimize a single lineup with the locked players treated as constraints.
@@ -112,38 +150,41 @@ class LateSwaptimizer:
         # Reset the optimization problem
         self.problem = LpProblem(f"Late_Swap_Optimization_{lineup['Entry ID']}", LpMaximize)
 
-        # Filter players whose games are not locked
-        eligible_players = [
-            player for player in self.players if not player.is_game_locked()
-        ]
+        # Filter players whose games are not locked; locked players get a zero objective weight
+        table = self.player_table
+        eligible = ~table.locked_mask(time.time())
 
         # Add static constraints
         constraint_manager = ConstraintManager(
-            self.site, self.problem, self.players, self.lp_variables, self.config
-        )
-        constraint_manager.add_static_constraints()
-
-        # Apply locked player constraints
-        self.apply_locked_constraints(lineup)
-
-        # Optimize once to calculate dynamic constraints
-        self.problem.setObjective(
-            lpSum(player.fpts * self.lp_variables[(player, position)]
-                  for player in eligible_players
-                  for position in player.position)
+            self.site, self.problem, self.players, self.lp_variables, self.config, table
         )
-        self.problem.solve(plp.GLPK(msg=0))
+        key = ("static_constraints", static_constraint_key(self.site, self.config))
+        if key not in self.cache:
+            self.cache[key] = constraint_manager.compile_static_constraints()
+        constraint_manager.add_compiled_constraints(self.cache[key])
+
+        # Apply locked player constraints; in the player-level formulation the other players
+        # must also fit the slots the locked players leave open
+        fixed_slots = self.apply_locked_constraints(lineup)
+        if self.formulation == "player" and fixed_slots:
+            constraint_manager.add_slot_constraints(fixed_slots)
+
+        # Optimize once to calculate dynamic constraints, starting from the entry's roster;
+        # the second solve then starts from this solution
+        self.problem.setObjective(self._eligible_expression(table.fpts, eligible))
+        if self.warm_start:
+            set_start(self.lp_variables, variable_keys(self._entry_roster(lineup), self.formulation))
+        self.problem.solve(self.solver)
 
         # Calculate fpts and ownership sums from the optimized lineup
-        fpts_sum = sum(
-            player.fpts for (player, _), var in self.lp_variables.items() if var.varValue == 1
-        )
+        selected_rows = [row for row, var in zip(self.var_rows, self.lp_variables.values()) if is_selected(var)]
+        fpts_sum = float(table.fpts[selected_rows].sum())
         
-        fpts_buffer = self.config.get("fpts_buffer", 0.98)
-        max_ownership_sum = self.config.get("max_ownership_sum")
-        ceiling_weight = self.config.get("ceiling_weight")
-        ownership_weight = self.config.get("ownership_weight")
-        randomness_factor = self.config.get("randomness_amount", 10) / 100  # Example: 10% randomness
+        fpts_buffer = self.fpts_buffer
+        max_ownership_sum = self.max_ownership_sum
+        ceiling_weight = self.ceiling_weight
+        ownership_weight = self.ownership_weight
+        randomness_factor = self.randomness_factor
 
 
         # Adjust constraints dynamically
@@ -151,40 +192,23 @@ class LateSwaptimizer:
         print(f"min_fpts: {dynamic_min_fpts}, max_ownership_sum: {max_ownership_sum}")
         constraint_manager.add_optional_constraints(dynamic_min_fpts, max_ownership_sum)
 
-        sampled_ceiling_values = {}
-        sampled_ownership_values = {}
-
         # Add randomness to ceiling values
-        for player in eligible_players:
-            # Example: random normal ~ (mean = player.ceiling, std ~ 1/4 of ceiling * randomness_factor)
-            # Tweak the factor as desired to not overshoot too much
-            ceiling_stddev = player.boom_pct * 0.25
-            ownership_stddev = player.ownership * 0.25
-
-            random_ceiling = np.random.normal(player.fpts, ceiling_stddev * randomness_factor)
-            random_ownership = np.random.normal(player.ownership, ownership_stddev * randomness_factor)
-
-            # Clip them to ensure no negative ownership, no crazy negative ceiling
-            random_ceiling = max(0.0, random_ceiling)
-            random_ownership = max(0.0, random_ownership)
-
-            sampled_ceiling_values[player] = random_ceiling
-            sampled_ownership_values[player] = random_ownership
-
-        # Scale randomized values
-        max_ownership = max(sampled_ownership_values.values(), default=1)  # Avoid division by zero
-        scaled_sampled_ownership = {player: value / max_ownership for player, value in sampled_ownership_values.items()}
-        max_ceiling = max(sampled_ceiling_values.values(), default=1)
-        scaled_sampled_ceiling = {player: value / max_ceiling for player, value in sampled_ceiling_values.items()}
+        # Example: random normal ~ (mean = player.fpts, std ~ 1/4 of boom% * randomness_factor)
+        # Tweak the factor as desired to not overshoot too much
+        # Clip them to ensure no negative ownership, no crazy negative ceiling
+        sampled_ceiling = sample_values(table.fpts, table.boom_pct * 0.25 * randomness_factor, 1, self.rng)
+        sampled_ownership = sample_values(table.ownership, table.ownership * 0.25 * randomness_factor, 1, self.rng)
+        sampled_ceiling[:, ~eligible] = 0.0
+        sampled_ownership[:, ~eligible] = 0.0
+
+        # Scale randomized values, avoiding division by zero
+        scaled_sampled_ceiling = scale_rows(sampled_ceiling)[0]
+        scaled_sampled_ownership = scale_rows(sampled_ownership)[0]
 
         self.problem.setObjective(
-            lpSum(
-                (
-                    ceiling_weight * scaled_sampled_ceiling[player]
-                    - ownership_weight * scaled_sampled_ownership[player]
-                ) * self.lp_variables[(player,position)]
-                for player in eligible_players
-                for position in player.position
+            self._eligible_expression(
+                ceiling_weight * scaled_sampled_ceiling - ownership_weight * scaled_sampled_ownership,
+                eligible,
             )
         )
 
@@ -194,18 +218,27 @@ class LateSwaptimizer:
             for constraint in self.problem.constraints.values():
                 print(constraint)
 
-            self.problem.solve(plp.GLPK(msg=1))  # Use msg=1 to print solver logs
+            self.problem.solve(self.verbose_solver)  # Prints the solver log
 
         except Exception as e:
-            print(f"GLPK crashed on lineup {lineup['Entry ID']}: {e}. Skipping...")
+            print(f"Solver crashed on lineup {lineup['Entry ID']}: {e}. Skipping...")
             return None
 
         # Extract the optimized lineup
         optimized_lineup = [
             (player, position)
             for (player, position), var in self.lp_variables.items()
-            if var.varValue == 1
+            if is_selected(var)
         ]
+        if self.formulation == "player":
+            # Match the players to slots, keeping the locked players in theirs
+            optimized_lineup = assign_lineup_slots(
+                self.site,
+                [player for player, _ in optimized_lineup],
+                {self.player_table.players[row].id: slot for row, slot in fixed_slots.items()},
+            )
+            if optimized_lineup is None:
+                print(f"No roster slot assignment for lineup {lineup['Entry ID']}. Skipping...")
         return optimized_lineup
 
 
@@ -217,31 +250,28 @@ class LateSwaptimizer:
         to an output CSV file in the specified format.
         :param output_csv_path: Path to save the output CSV file with optimized lineups.
         """
-        # Convert the input lineups into a DataFrame for easy manipulation
-        lineups_df = pd.DataFrame(self.lineups)
+        entries = self.lineups
+        output_labels = entries.slot_labels.copy()
+        fully_locked = entries.fully_locked()
         lineups = Lineups()
 
+        # Upcoming lock events of the pool; locked players are re-derived only when one passes
+        for epoch, rows in self.player_table.lock_timeline.next_locks(time.time(), count=3):
+            print(f"Next lock at {time.strftime('%H:%M', time.localtime(epoch))}: {len(rows)} players")
+
 
         # Loop through each lineup and optimize it
-        for index, lineup in lineups_df.iterrows():
-            # print(f"Optimizing lineup for entry ID {lineup['Entry ID']}...")
-
-            # Convert the current row to a dictionary
-            lineup_dict = lineup.to_dict()
-
-            # Check if all players in the lineup are locked based on the '_is_locked' flags
-            locked_players = [
-                lineup_dict.get(f"{position}_is_locked", False) 
-                for position in ["PG", "SG", "SF", "PF", "C", "G", "F", "UTIL"]
-            ]
-            
+        for index in range(len(entries)):
             # If all players are locked, skip this lineup and do nothing else
-            if all(locked_players):
-                print(f"All players are locked for lineup {lineup['Entry ID']}. Skipping optimization.")
+            if fully_locked[index]:
+                print(f"All players are locked for lineup {entries.entry_ids[index]}. Skipping optimization.")
                 continue  # Skip this lineup and move to the next one
 
             # Optimize the lineup with locked player constraints
-            optimized_lineup = self.optimize_single_lineup(lineup_dict)
+            optimized_lineup = self.optimize_single_lineup(entries.entry(index))
+            if optimized_lineup is None:
+                # Solver crash or no slot assignment; the entry keeps its current roster
+                continue
             optimized_lineups = self.adjust_roster_for_late_swap(optimized_lineup)
             lineups.add_lineup(optimized_lineups)
 
@@ -252,25 +282,22 @@ class LateSwaptimizer:
                     for player, position in optimized_lineup
                 }
 
-                # Update the DataFrame with optimized values
-                for position in ["PG", "SG", "SF", "PF", "C", "G", "F", "UTIL"]:
-                    lineups_df.at[index, position] = optimized_lineup_dict.get(position, lineup[position])
-
-        # Define the desired output columns
-        output_columns = [
-            "Entry ID", "Contest Name", "Contest ID", "Entry Fee",
-            "PG", "SG", "SF", "PF", "C", "G", "F", "UTIL"
-        ]
-
-        # Filter the DataFrame to include only the desired columns
-        if not set(output_columns).issubset(lineups_df.columns):
-            missing_columns = set(output_columns) - set(lineups_df.columns)
-            raise KeyError(f"Missing required columns in DataFrame: {missing_columns}")
+                # Update the output labels with optimized values
+                for column, position in enumerate(entries.slots):
+                    output_labels[index, column] = optimized_lineup_dict.get(position, output_labels[index, column])
 
-        formatted_df = lineups_df[output_columns]
-        
         # Save the updated lineups to a CSV file
-        formatted_df.to_csv(output_csv_path, index=False)
+        with open(output_csv_path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["Entry ID", "Contest Name", "Contest ID", "Entry Fee", *entries.slots])
+            for index in range(len(entries)):
+                writer.writerow([
+                    entries.entry_ids[index],
+                    entries.contest_names[index],
+                    entries.contest_ids[index],
+                    entries.entry_fees[index],
+                    *output_labels[index],
+                ])
         print(f"Optimized lineups have been written to {output_csv_path}")
         lineups.show_lineups_overview()
         return lineups
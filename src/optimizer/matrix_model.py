@@ -0,0 +1,257 @@
+import numpy as np
+from optimizer.constraints import salary_limits
+from optimizer.slots import position_limits, slot_masks, hall_groups
+
+try:
+    import scipy.sparse as sparse
+    from scipy.optimize import milp, LinearConstraint, Bounds
+except ImportError:  # scipy is optional; without it the matrix model is unavailable
+    sparse = None
+
+try:
+    import highspy
+except ImportError:  # without highspy the matrix model solves through scipy.optimize.milp
+    highspy = None
+
+
+def matrix_model_available():
+    """:return: True if scipy is installed, which the matrix model needs."""
+    return sparse is not None
+
+
+class MatrixModel:
+    """
+    The lineup problem as a sparse matrix, built straight from a PlayerTable.
+
+    Columns are the binary (player, position) variables in PlayerTable.variable_layout
+    order (one per player in the player-level formulation); every constraint is a row
+    lower <= A x <= upper. The static constraints are the ones
+    ConstraintManager.add_static_constraints adds, built as whole CSR blocks instead of one
+    PuLP expression per row.
+
+    With solver 'highs' or 'auto' and highspy installed, the model is passed to one Highs
+    instance once; later rows (uniqueness cuts) and objectives are sent as changes to it.
+    Otherwise every solve goes through scipy.optimize.milp. CBC and GLPK only take PuLP
+    models, so those solver settings fall back to scipy.optimize.milp with a note.
+    """
+
+    def __init__(self, site, player_table, config, variable_layout=None):
+        """
+        :param site: 'dk' or 'fd'.
+        :param player_table: PlayerTable of the pool.
+        :param config: Config with the constraint settings.
+        :param variable_layout: (rows, positions) of PlayerTable.variable_layout, if already built.
+        """
+        if sparse is None:
+            raise ImportError("The matrix model requires scipy")
+        self.site = site
+        self.player_table = player_table
+        self.config = config
+        self.formulation = config.formulation
+        self.var_rows, var_positions = variable_layout or player_table.variable_layout(self.formulation)
+        self.var_positions = np.array(var_positions, dtype=object)
+        self.num_vars = len(self.var_rows)
+
+        solver = config.solver
+        self.use_highspy = highspy is not None and solver in ("highs", "auto")
+        if solver not in ("highs", "auto"):
+            print(f"The matrix model builder cannot use solver '{solver}', solving with scipy.optimize.milp.")
+
+        # Row blocks as (CSR matrix, lower bounds, upper bounds, row names)
+        self.blocks = []
+        self._matrix = None
+        self._highs = None
+        self._passed_rows = 0
+        self.add_static_constraints()
+
+    @property
+    def num_rows(self):
+        return sum(block[0].shape[0] for block in self.blocks)
+
+    def add_rows(self, matrix, lower, upper, names):
+        """
+        Append constraint rows.
+        :param matrix: Sparse or dense array with one column per variable.
+        :param lower: Lower bound per row (-inf for none).
+        :param upper: Upper bound per row (inf for none).
+        :param names: Row names.
+        """
+        matrix = sparse.csr_array(matrix)
+        if matrix.shape[0] == 0:
+            return
+        self.blocks.append((
+            matrix,
+            np.broadcast_to(np.asarray(lower, dtype=float), (matrix.shape[0],)),
+            np.broadcast_to(np.asarray(upper, dtype=float), (matrix.shape[0],)),
+            list(names),
+        ))
+        self._matrix = None
+
+    def _group_rows(self, groups, values, num_groups):
+        """
+        One row per group: row g holds values[player] for the variables whose group is g.
+        :param groups: Group index per variable (-1 leaves the variable out).
+        :param values: Coefficient per table row.
+        :param num_groups: Number of groups (rows).
+        """
+        keep = groups >= 0
+        columns = np.flatnonzero(keep)
+        return sparse.csr_array(
+            (np.asarray(values, dtype=float)[self.var_rows[columns]], (groups[keep], columns)),
+            shape=(num_groups, self.num_vars),
+        )
+
+    def _player_row(self, values):
+        """Single row with values[player] for every variable."""
+        return np.asarray(values, dtype=float)[self.var_rows][np.newaxis, :]
+
+    def add_static_constraints(self):
+        table = self.player_table
+        ones = np.ones(len(table))
+
+        min_salary, max_salary = salary_limits(self.site, self.config)
+        self.add_rows(
+            self._player_row(table.salary),
+            -np.inf if min_salary is None else min_salary,
+            max_salary,
+            ["Salary"],
+        )
+
+        limits = position_limits(self.site)
+        positions = list(limits)
+        if self.formulation == "player":
+            # One variable per player: the roster size and the Hall counting rows,
+            # see ConstraintManager.add_slot_constraints
+            capacities = list(limits.values())
+            masks = slot_masks(table.position_bits, positions)[self.var_rows]
+            groups = hall_groups(masks, capacities)
+            self.add_rows(np.ones((1, self.num_vars)), sum(capacities), sum(capacities), ["Roster_Size"])
+            self.add_rows(
+                np.array([(masks & ~union) == 0 for union, _ in groups], dtype=float),
+                -np.inf,
+                [capacity for _, capacity in groups],
+                [
+                    "Slots_" + "_".join(pos for index, pos in enumerate(positions) if union >> index & 1)
+                    for union, _ in groups
+                ],
+            )
+        else:
+            position_index = {position: index for index, position in enumerate(positions)}
+            groups = np.array([position_index.get(position, -1) for position in self.var_positions], dtype=np.int64)
+            counts = np.array([limits[position] for position in positions], dtype=float)
+            self.add_rows(
+                self._group_rows(groups, ones, len(positions)), counts, counts,
+                [f"Position_{pos}" for pos in positions],
+            )
+            self.add_rows(
+                self._group_rows(self.var_rows, ones, len(table)), -np.inf, 1,
+                [f"Single_Use_{player.name}" for player in table.players],
+            )
+
+        max_team_salary = self.config.get("max_team_salary")
+        if max_team_salary:
+            self.add_rows(
+                self._group_rows(table.team_code[self.var_rows], table.salary, len(table.teams)),
+                -np.inf, max_team_salary,
+                [f"Global_Team_Salary_Limit_{team}" for team in table.teams],
+            )
+
+        for matchup, limit in self.config.get("matchup_limits", {}).items():
+            self.add_rows(self._player_row(table.game_mask(matchup)), -np.inf, limit, [f"Matchup_{matchup}"])
+        for team, limit in self.config.get("team_limits", {}).items():
+            self.add_rows(self._player_row(table.team_mask(team)), -np.inf, limit, [f"Team_{team}"])
+
+    def add_optional_constraints(self, min_fpts=None, max_ownership=None):
+        """
+        Add the lineup ownership maximum and fpts minimum, see ConstraintManager.add_optional_constraints.
+        """
+        if max_ownership is not None:
+            self.add_rows(self._player_row(self.player_table.ownership), -np.inf, max_ownership, ["Max_Ownership"])
+        if min_fpts is not None:
+            self.add_rows(self._player_row(self.player_table.fpts), min_fpts, np.inf, ["Min_FPTS"])
+
+    def add_uniqueness_cut(self, rows, size, num_uniques, name):
+        """
+        Keep later lineups from sharing more than size - num_uniques players with a lineup.
+        :param rows: PlayerTable rows of the lineup's players.
+        :param size: Number of players in the lineup.
+        """
+        in_lineup = np.isin(self.var_rows, rows).astype(float)[np.newaxis, :]
+        self.add_rows(in_lineup, -np.inf, size - num_uniques, [name])
+
+    def matrix(self):
+        """
+        :return: Tuple of (CSR constraint matrix, lower bounds, upper bounds) over all rows.
+        """
+        if self._matrix is None:
+            self._matrix = (
+                sparse.vstack([block[0] for block in self.blocks], format="csr"),
+                np.concatenate([block[1] for block in self.blocks]),
+                np.concatenate([block[2] for block in self.blocks]),
+            )
+        return self._matrix
+
+    def row_names(self):
+        return [name for block in self.blocks for name in block[3]]
+
+    def solve(self, objective, start=None):
+        """
+        Maximize objective . x over the binary variables.
+        :param objective: Coefficient per variable.
+        :param start: Optional 0/1 value per variable passed as a MIP start (ignored by scipy.optimize.milp).
+        :return: Boolean mask of the selected variables, or None if no optimal solution was found.
+        """
+        objective = np.asarray(objective, dtype=float)
+        if self.use_highspy:
+            return self._solve_highs(objective, start)
+
+        matrix, lower, upper = self.matrix()
+        result = milp(
+            -objective,
+            constraints=LinearConstraint(matrix, lower, upper),
+            integrality=np.ones(self.num_vars),
+            bounds=Bounds(0, 1),
+        )
+        if result.status != 0:
+            return None
+        return result.x > 0.5
+
+    def _solve_highs(self, objective, start):
+        if self._highs is None:
+            matrix, lower, upper = self.matrix()
+            self._highs = highspy.Highs()
+            self._highs.setOptionValue("output_flag", False)
+            self._highs.passModel(
+                self.num_vars, matrix.shape[0], matrix.nnz, int(highspy.MatrixFormat.kRowwise),
+                int(highspy.ObjSense.kMaximize), 0.0,
+                objective, np.zeros(self.num_vars), np.ones(self.num_vars),
+                _finite(lower), _finite(upper),
+                matrix.indptr[:-1].astype(np.int32), matrix.indices.astype(np.int32), matrix.data,
+                np.ones(self.num_vars, dtype=np.int32),
+            )
+            self._passed_rows = matrix.shape[0]
+        else:
+            # Send the rows added since the last solve and the new objective
+            matrix, lower, upper = self.matrix()
+            if matrix.shape[0] > self._passed_rows:
+                new = matrix[self._passed_rows:]
+                self._highs.addRows(
+                    new.shape[0], _finite(lower[self._passed_rows:]), _finite(upper[self._passed_rows:]),
+                    new.nnz, new.indptr[:-1].astype(np.int32), new.indices.astype(np.int32), new.data,
+                )
+                self._passed_rows = matrix.shape[0]
+            self._highs.changeColsCost(self.num_vars, np.arange(self.num_vars, dtype=np.int32), objective)
+
+        if start is not None:
+            solution = highspy.HighsSolution()
+            solution.col_value = np.asarray(start, dtype=float)
+            self._highs.setSolution(solution)
+        self._highs.run()
+        if self._highs.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+            return None
+        return np.asarray(self._highs.getSolution().col_value) > 0.5
+
+
+def _finite(bounds):
+    """Replace infinite bounds by HiGHS' infinity."""
+    return np.clip(bounds, -highspy.kHighsInf, highspy.kHighsInf)
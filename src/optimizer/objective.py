@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def sample_values(mean, scale, num_samples, rng):
+    """
+    Draw perturbed copies of a value per player, clipped at zero.
+    :param mean: Array with one mean per PlayerTable row.
+    :param scale: Array of standard deviations in the same order.
+    :param num_samples: Number of copies (rows) to draw.
+    :param rng: numpy.random.Generator to draw from.
+    :return: (num_samples, players) array.
+    """
+    mean = np.asarray(mean, dtype=float)
+    return np.maximum(0.0, rng.normal(mean, scale, size=(num_samples, len(mean))))
+
+
+def scale_rows(values):
+    """
+    Divide every row by its maximum; rows without a positive value are left unscaled.
+    :param values: 2-D array.
+    :return: New array with every row scaled to a maximum of 1.
+    """
+    row_max = values.max(axis=1, initial=0.0, keepdims=True)
+    return values / np.where(row_max > 0.0, row_max, 1.0)
+
+
+def sample_objectives(table, num_lineups, config, rng):
+    """
+    Randomized objective coefficients of every lineup of a build, drawn at once.
+
+    Ceiling (boom%) and ownership are perturbed with a standard deviation of
+    randomness_amount% / 4 of their value, scaled per lineup to a maximum of 1 and
+    combined as ceiling_weight * ceiling - ownership_weight * ownership.
+    :param table: PlayerTable of the pool.
+    :param num_lineups: Number of lineups (rows) to draw.
+    :param config: Config with randomness_amount, ceiling_weight and ownership_weight.
+    :param rng: numpy.random.Generator to draw from.
+    :return: (num_lineups, players) array; row i is the objective of lineup i.
+    """
+    randomness_factor = config.get("randomness_amount", 10) / 100
+    ceiling = sample_values(table.boom_pct, table.boom_pct * 0.25 * randomness_factor, num_lineups, rng)
+    ownership = sample_values(table.ownership, table.ownership * 0.25 * randomness_factor, num_lineups, rng)
+    return (
+        config.get("ceiling_weight", 1.0) * scale_rows(ceiling)
+        - config.get("ownership_weight", 1.0) * scale_rows(ownership)
+    )
@@ -1,32 +1,156 @@
-from pulp import LpProblem, LpMaximize, lpSum, LpMinimize
+from concurrent.futures import ProcessPoolExecutor
+from pulp import LpProblem, LpMaximize, LpMinimize
 import matplotlib.pyplot as plt
-from optimizer.constraints import ConstraintManager
+from optimizer.constraints import ConstraintManager, weighted_sum, static_constraint_key, salary_limits
+from data.player_table import PlayerTable
 import numpy as np
 from lineups.lineups import Lineups
 import pulp as plp
+from optimizer.solvers import get_solver, is_selected, set_start, takes_start
+from optimizer.objective import sample_objectives
+from optimizer.matrix_model import MatrixModel, matrix_model_available
+from optimizer.slots import assign_lineup_slots, variable_keys, cached_variables, create_variables
 
 
 class Optimizer:
-    def __init__(self, site, players, num_lineups, num_uniques, config):
+    def __init__(self, site, players, num_lineups, num_uniques, config, player_table=None, cache=None, rng=None):
         self.site = site
         self.players = players
+        self.player_table = player_table if player_table is not None else PlayerTable(players)
         self.num_lineups = num_lineups
         self.num_uniques = num_uniques
         self.config = config
+        # Structures shared by optimizers over the same pool (see SlateSession)
+        self.cache = cache if cache is not None else {}
+        # Generator of the objective perturbations (default: seeded from config seed,
+        # or from fresh entropy when no seed is set)
+        self.rng = rng if rng is not None else np.random.default_rng(self.config.seed)
+        self.solver = get_solver(config.solver, warm_start=config.warm_start)
+        # Starts are only built when the resolved backend receives them
+        self.warm_start = takes_start(self.solver)
         self.problem = LpProblem("NBA_DFS_Optimization", LpMaximize)
-        self.lp_variables = {}
         self.player_exposure = {player: 0 for player in players}  # Initialize exposure tracker
 
         self.position_map = {i: ["G", "F", "C", "UTIL"] for i in range(len(players))}
         self.min_fpts = 0
 
-        # Create LP variables for each player and position
-        for player in players:
-            for position in player.position:
-                var_name = f"{player.name}_{position}_{player.id}"
-                self.lp_variables[(player, position)] = plp.LpVariable(
-                    name=var_name, cat=plp.LpBinary
-                )
+        # Create LP variables for each player and position (or each player in the player-level
+        # formulation), in PlayerTable.variable_layout order
+        self.formulation = config.formulation
+        self.var_rows, self.var_positions, self.lp_variables = cached_variables(
+            self.cache, self.player_table, self.formulation
+        )
+
+    def _static_constraints(self, constraint_manager):
+        """
+        Compiled static constraints for the current LP variables, cached per site and config.
+        """
+        key = ("static_constraints", static_constraint_key(self.site, self.config))
+        if self.lp_variables is not self.cache.get(("lp_variables", self.formulation)):
+            return constraint_manager.compile_static_constraints()
+        if key not in self.cache:
+            self.cache[key] = constraint_manager.compile_static_constraints()
+        return self.cache[key]
+
+    def _build_problem(self, name, min_fpts, max_ownership_sum):
+        """
+        Create a problem holding the static and optional constraints, without an objective.
+        """
+        problem = LpProblem(name, LpMaximize)
+        constraint_manager = ConstraintManager(
+            self.site, problem, self.players, self.lp_variables, self.config, self.player_table
+        )
+        constraint_manager.add_compiled_constraints(self._static_constraints(constraint_manager))
+        constraint_manager.add_optional_constraints(min_fpts, max_ownership_sum)
+        return problem
+
+    def _create_variables(self, suffix=""):
+        """
+        (Re)create one binary LP variable per (player, position) pair.
+        :param suffix: Optional suffix appended to every variable name.
+        """
+        self.lp_variables = create_variables(self.player_table, self.var_rows, self.var_positions, suffix)
+
+    def _expression(self, player_values):
+        """
+        Build sum(player_values[player] * x[player, position]) over all variables.
+        :param player_values: Array with one value per PlayerTable row.
+        """
+        return weighted_sum(list(self.lp_variables.values()), np.asarray(player_values)[self.var_rows])
+
+    def _selected_rows(self):
+        """
+        :return: Table rows of the players selected in the last solve.
+        """
+        return np.array(
+            [row for row, var in zip(self.var_rows, self.lp_variables.values()) if is_selected(var)],
+            dtype=np.int64,
+        )
+
+    def _assign_slots(self, selected):
+        """
+        :param selected: Keys of the selected LP variables.
+        :return: List of (player, position) pairs. In the player-level formulation the players
+                 are matched to roster slots; None if they cannot fill the roster.
+        """
+        if self.formulation == "player":
+            return assign_lineup_slots(self.site, [player for player, _ in selected])
+        return list(selected)
+
+    def _repair_start(self, lineup, player_values):
+        """
+        Turn the previous lineup, which its own uniqueness cut now excludes, into a start
+        for the next solve: going from the lowest new objective value up, num_uniques players
+        are replaced by the best unused player eligible for the same slot that keeps the
+        lineup salary, fpts, ownership and team salary sums within their limits. The solver checks the start
+        and ignores it if another constraint rejects it.
+        :param lineup: List of (player, position) pairs of the previous lineup.
+        :param player_values: Objective coefficient of every table row for the next solve.
+        :return: List of (player, position) pairs.
+        """
+        table = self.player_table
+        min_salary, max_salary = salary_limits(self.site, self.config)
+        # (column, lower limit, upper limit) of the lineup sums the swaps must respect
+        limits = [
+            (table.salary, min_salary, max_salary),
+            (table.fpts, self.config.get("min_fpts"), None),
+            (table.ownership, None, self.config.get("max_ownership_sum")),
+        ]
+        max_team_salary = self.config.get("max_team_salary")
+        rows = [table.index_of[player.id] for player, _ in lineup]
+        totals = [float(column[rows].sum()) for column, _, _ in limits]
+        team_salary = np.bincount(table.team_code[rows], weights=table.salary[rows], minlength=len(table.teams))
+        used = np.zeros(len(table), dtype=bool)
+        used[rows] = True
+
+        start = list(lineup)
+        replaced = 0
+        for index in np.argsort(player_values[rows], kind="stable"):
+            if replaced == self.num_uniques:
+                break
+            row = rows[index]
+            position = start[index][1]
+            candidates = table.eligible(position) & ~used
+            for (column, lower, upper), total in zip(limits, totals):
+                new_total = total - column[row] + column
+                if lower is not None:
+                    candidates &= new_total >= lower
+                if upper is not None:
+                    candidates &= new_total <= upper
+            if max_team_salary:
+                same_team = table.team_code == table.team_code[row]
+                new_team_salary = team_salary[table.team_code] - np.where(same_team, table.salary[row], 0) + table.salary
+                candidates &= new_team_salary <= max_team_salary
+            if not candidates.any():
+                continue
+            best = int(np.argmax(np.where(candidates, player_values, -np.inf)))
+            used[best] = True
+            totals = [total - column[row] + column[best] for (column, _, _), total in zip(limits, totals)]
+            team_salary[table.team_code[row]] -= table.salary[row]
+            team_salary[table.team_code[best]] += table.salary[best]
+            start[index] = (table.players[best], position)
+            replaced += 1
+        return start
 
     def adjust_roster_for_late_swap(self, lineup):
         """
@@ -98,22 +222,16 @@ class Optimizer:
 
         stage1_problem = LpProblem("BaselineMaxFPTS", LpMaximize)
         constraint_manager = ConstraintManager(
-            self.site, stage1_problem, self.players, self.lp_variables, self.config
+            self.site, stage1_problem, self.players, self.lp_variables, self.config, self.player_table
         )
         constraint_manager.add_static_constraints()
 
         # Objective: Maximize total fantasy points
-        stage1_problem.setObjective(
-            lpSum(
-                player.fpts * self.lp_variables[(player, position)]
-                for player in self.players
-                for position in player.position
-            )
-        )
+        stage1_problem.setObjective(self._expression(self.player_table.fpts))
 
         # Solve
         try:
-            stage1_problem.solve(plp.GLPK(msg=0))
+            stage1_problem.solve(self.solver)
         except plp.PulpSolverError:
             print("Infeasibility during baseline max-FPTS.")
             return
@@ -123,9 +241,7 @@ class Optimizer:
             return
 
         # Extract baseline_fpts
-        final_vars = [k for k, v in self.lp_variables.items() if v.varValue == 1]
-        final_lineup = [(player, pos) for (player, pos) in final_vars]
-        baseline_fpts = sum(player.fpts for player, _ in final_lineup)
+        baseline_fpts = float(self.player_table.fpts[self._selected_rows()].sum())
         print(f"Baseline FPTS found: {baseline_fpts}")
 
         # We'll store results here
@@ -216,43 +332,29 @@ class Optimizer:
 
         # Re-create LP variables. In practice, you might want to copy 
         # or re-initialize them to avoid clashes with older constraints.
-        self.lp_variables = {}
-        for player in self.players:
-            for position in player.position:
-                var_name = f"{player.name}_{position}_{player.id}_{prob_name}"
-                self.lp_variables[(player, position)] = plp.LpVariable(
-                    name=var_name, cat=plp.LpBinary
-                )
+        self._create_variables(suffix=f"_{prob_name}")
 
         # Add constraints
         constraint_manager = ConstraintManager(
-            self.site, problem, self.players, self.lp_variables, self.config
+            self.site, problem, self.players, self.lp_variables, self.config, self.player_table
         )
         constraint_manager.add_static_constraints()
 
         # FPTS >= fpts_min constraint
         # sum of (player.fpts * x[p]) >= fpts_min
         problem += (
-            lpSum(
-                player.fpts * self.lp_variables[(player, position)]
-                for player in self.players
-                for position in player.position
-            ) >= fpts_min,
+            self._expression(self.player_table.fpts) >= fpts_min,
             "MinFptsConstraint"
         )
 
         # Objective: sum of ownership
-        ownership_expr = lpSum(
-            player.ownership * self.lp_variables[(player, position)]
-            for player in self.players
-            for position in player.position
-        )
+        ownership_expr = self._expression(self.player_table.ownership)
         # If maximizing, set objective to ownership_expr; if minimizing, set to ownership_expr
         problem.setObjective(ownership_expr)
 
         # Solve
         try:
-            problem.solve(plp.GLPK(msg=0))
+            problem.solve(self.solver)
         except plp.PulpSolverError:
             print(f"Infeasibility in {prob_name}.")
             return None
@@ -263,9 +365,7 @@ class Optimizer:
             return None
 
         # Compute final ownership sum
-        final_vars = [k for k, v in self.lp_variables.items() if v.varValue == 1]
-        final_lineup = [(player, pos) for (player, pos) in final_vars]
-        total_ownership = sum(player.ownership for (player, _) in final_lineup)
+        total_ownership = float(self.player_table.ownership[self._selected_rows()].sum())
 
         return total_ownership
 
@@ -276,91 +376,103 @@ class Optimizer:
         Run the optimization process in two stages:
         1. Extract the baseline fpts and ownership from the first lineup.
         2. Use these baseline values to set constraints and maximize ceiling with added randomness.
+
+        With workers > 1 the lineups are generated in parallel, see _run_parallel.
         :return: Lineups instance containing optimized lineups.
         """
+        workers = min(self.config.workers, self.num_lineups)
+        if workers > 1:
+            generated = self._run_parallel(workers)
+        else:
+            generated = self._generate(self.num_lineups)
+
         lineups = Lineups()  # Object to store all generated lineups
+        for lineup in generated:
+            lineups.add_lineup(lineup)
+        lineups.show_lineups_overview()
+        return lineups
+
+    def _uniqueness_cut(self, rows, size):
+        """
+        Constraint keeping the next lineups from sharing more than size - num_uniques
+        players with a lineup.
+        :param rows: PlayerTable rows of the lineup's players.
+        :param size: Number of players in the lineup.
+        """
+        in_lineup = np.isin(self.var_rows, rows)
+        return weighted_sum(
+            [var for var, keep in zip(self.lp_variables.values(), in_lineup) if keep],
+            np.ones(int(in_lineup.sum())),
+        ) <= size - self.num_uniques
+
+    def _generate(self, num_lineups, fixed_lineups=()):
+        """
+        Generate lineups one after another.
+
+        With persistent_model (the default) the problem is built once; every lineup only
+        replaces the objective and appends its uniqueness cut. Otherwise a new problem is
+        built per lineup and every earlier cut is added to it again. With warm_start every
+        solve after the first starts from a repaired copy of the previous lineup.
+        :param num_lineups: Number of lineups to generate.
+        :param fixed_lineups: Lineups generated elsewhere; the new lineups stay unique
+                              against them and their players count toward exposure.
+        :return: List of lineups as lists of (player, position) pairs; shorter than
+                 num_lineups if a solve fails.
+        """
+        if self.config.model_builder == "matrix":
+            if matrix_model_available():
+                return self._generate_matrix(num_lineups, fixed_lineups)
+            print("The matrix model builder needs scipy, building the model with PuLP.")
+
+        generated = []
         exclusion_constraints = []  # List to store uniqueness constraints
+        persistent = self.config.persistent_model
         
-        randomness_factor = self.config.get("randomness_amount", 10) / 100  # Example: 10% randomness
-        ceiling_weight = self.config.get("ceiling_weight", 1.0)
-        ownership_weight = self.config.get("ownership_weight", 1.0)
         min_fpts = self.config.get("min_fpts")
         max_ownership_sum = self.config.get("max_ownership_sum")
 
-        player_exposure_counts = {player.name: 0 for player in self.players}
-        exposure_penalty_factor = self.config.get("exposure_penalty", 0)  # Adjust this factor to control the penalty severity
+        table = self.player_table
+        exposure_weight = self.config.get("exposure_penalty", 0.1)  # Default exposure penalty weight
 
-    
-        # Stage 3: Optimize subsequent lineups with added randomness
-        # Initialize player exposure counts
-        player_exposure_counts = {player: 0 for player in self.players}
-        exposure_penalty_factor = 0.1  # Adjust this factor to control the penalty severity
+        # Randomized ceiling/ownership objective of every lineup, one row per lineup
+        objectives = sample_objectives(table, num_lineups, self.config, self.rng)
 
         # Stage 3: Optimize subsequent lineups with added randomness
-        for i in range(self.num_lineups):
+        # Exposure counts per PlayerTable row
+        player_exposure_counts = np.zeros(len(table))
+        previous_lineup = None
+
+        if persistent:
+            self.problem = self._build_problem("Stage2_NBA_DFS_Optimization", min_fpts, max_ownership_sum)
+
+        for k, lineup in enumerate(fixed_lineups):
+            rows = [table.index_of[player.id] for player, _ in lineup]
+            player_exposure_counts[rows] += 1
+            if persistent:
+                self.problem += (self._uniqueness_cut(rows, len(lineup)), f"Fixed_Uniqueness_{k}")
+            else:
+                exclusion_constraints.append(self._uniqueness_cut(rows, len(lineup)))
+
+        for i in range(num_lineups):
             if i % 2 == 0:
                 print(f"Generating lineup {i}")
 
-            # Define a new problem for this iteration
-            self.problem = LpProblem(f"Stage2_NBA_DFS_Optimization_{i}", LpMaximize)
-
-            # Add existing exclusion constraints to the problem
-            for constraint in exclusion_constraints:
-                self.problem += constraint
-
-            # Reinitialize constraints for the new problem
-            constraint_manager = ConstraintManager(
-                self.site, self.problem, self.players, self.lp_variables, self.config
-            )
-            constraint_manager.add_static_constraints()
-            constraint_manager.add_optional_constraints(min_fpts, max_ownership_sum)
-
-            # Initialize sampled values for ceilings and ownerships
-            sampled_ceiling_values = {}
-            sampled_ownership_values = {}
-
-            # Add randomness to ceiling and ownership values
-            for player in self.players:
-                ceiling_stddev = player.boom_pct * 0.25
-                ownership_stddev = player.ownership * 0.25
-
-                random_ceiling = np.random.normal(player.boom_pct, ceiling_stddev * randomness_factor)
-                random_ownership = np.random.normal(player.ownership, ownership_stddev * randomness_factor)
-
-                random_ceiling = max(0.0, random_ceiling)
-                random_ownership = max(0.0, random_ownership)
-
-                sampled_ceiling_values[player] = random_ceiling
-                sampled_ownership_values[player] = random_ownership
-
-            # Scale randomized values
-            max_ownership = max(sampled_ownership_values.values(), default=1)
-            scaled_sampled_ownership = {player: value / max_ownership for player, value in sampled_ownership_values.items()}
-            max_ceiling = max(sampled_ceiling_values.values(), default=1)
-            scaled_sampled_ceiling = {player: value / max_ceiling for player, value in sampled_ceiling_values.items()}
-            exposure_percentages = {
-                player: player_exposure_counts[player] / self.num_lineups
-                for player in self.players
-            }
-
-            exposure_weight = self.config.get("exposure_penalty", 0.1)  # Default exposure penalty weight
+            if not persistent:
+                # Define a new problem for this iteration, with every earlier exclusion constraint
+                self.problem = self._build_problem(f"Stage2_NBA_DFS_Optimization_{i}", min_fpts, max_ownership_sum)
+                for constraint in exclusion_constraints:
+                    self.problem += constraint
 
             # Set objective with exposure penalty
-            self.problem.setObjective(
-                lpSum(
-                    (
-                        ceiling_weight * scaled_sampled_ceiling[player]
-                        - ownership_weight * scaled_sampled_ownership[player]
-                        - exposure_weight * player_exposure_counts[player]
-                    ) * self.lp_variables[(player, position)]
-                    for player in self.players
-                    for position in player.position
-                )
-            )
+            objective_values = objectives[i] - exposure_weight * player_exposure_counts
+            self.problem.setObjective(self._expression(objective_values))
+            if self.warm_start and previous_lineup:
+                start = self._repair_start(previous_lineup, objective_values)
+                set_start(self.lp_variables, variable_keys(start, self.formulation))
 
             # Solve the problem
             try:
-                self.problem.solve(plp.GLPK(msg=0))
+                self.problem.solve(self.solver)
             except plp.PulpSolverError:
                 print(f"Infeasibility during Stage 2 optimization for lineup {i}.")
                 break
@@ -371,39 +483,144 @@ class Optimizer:
 
             # Extract the optimized lineup
             final_vars = [
-                key for key, var in self.lp_variables.items() if var.varValue == 1
+                key for key, var in self.lp_variables.items() if is_selected(var)
             ]
-            final_lineup = [(player, position) for player, position in final_vars]
+            final_lineup = self._assign_slots(final_vars)
+            if final_lineup is None:
+                print(f"No roster slot assignment for lineup {i}.")
+                break
+            selected_rows = self._selected_rows()
 
             # Update exposure counts for each player in the final lineup
-            for player, _ in final_lineup:
-                player_exposure_counts[player] += 1  # Increment the count for each player
+            player_exposure_counts[selected_rows] += 1
 
             # Save the lineup
             self.adjust_roster_for_late_swap(final_lineup)
-            lineups.add_lineup(final_lineup)
+            generated.append(final_lineup)
+            previous_lineup = final_lineup
 
             # Add exclusion constraint to prevent exact duplicate lineups
-            player_ids = [player.id for player, _ in final_lineup]
-            player_keys_to_exclude = [
-                (p, pos) for p in self.players if p.id in player_ids for pos in p.position
-            ]
-            exclusion_constraint = lpSum(
-                self.lp_variables[(player, pos)] for player, pos in player_keys_to_exclude
-            ) <= len(final_vars) - self.num_uniques
-            exclusion_constraints.append(exclusion_constraint)
+            exclusion_constraint = self._uniqueness_cut(selected_rows, len(final_vars))
+            if persistent:
+                self.problem += (exclusion_constraint, f"Uniqueness_{i}")
+            else:
+                exclusion_constraints.append(exclusion_constraint)
 
+        return generated
 
-        lineups.show_lineups_overview()
-        return lineups
-
-
-    
-
-    
+    def _generate_matrix(self, num_lineups, fixed_lineups=()):
+        """
+        _generate over a MatrixModel: the constraints are built as sparse matrices from the
+        PlayerTable and solved through highspy (or scipy.optimize.milp) without PuLP
+        expressions, see MatrixModel for which solver settings it follows. The model is
+        always persistent.
+        """
+        if not self.config.persistent_model:
+            print("The matrix model builder always keeps one persistent model, ignoring persistent_model.")
+        table = self.player_table
+        exposure_weight = self.config.get("exposure_penalty", 0.1)
+        objectives = sample_objectives(table, num_lineups, self.config, self.rng)
+        player_exposure_counts = np.zeros(len(table))
+        var_index = {key: index for index, key in enumerate(self.lp_variables)}
+
+        model = MatrixModel(self.site, table, self.config, (self.var_rows, self.var_positions))
+        model.add_optional_constraints(self.config.get("min_fpts"), self.config.get("max_ownership_sum"))
+        for k, lineup in enumerate(fixed_lineups):
+            rows = [table.index_of[player.id] for player, _ in lineup]
+            player_exposure_counts[rows] += 1
+            model.add_uniqueness_cut(rows, len(lineup), self.num_uniques, f"Fixed_Uniqueness_{k}")
+
+        generated = []
+        previous_lineup = None
+        for i in range(num_lineups):
+            if i % 2 == 0:
+                print(f"Generating lineup {i}")
 
+            objective_values = objectives[i] - exposure_weight * player_exposure_counts
+            start = None
+            if self.warm_start and model.use_highspy and previous_lineup:
+                start = np.zeros(model.num_vars)
+                repaired = self._repair_start(previous_lineup, objective_values)
+                start[[var_index[key] for key in variable_keys(repaired, self.formulation)]] = 1
 
+            selected = model.solve(objective_values[self.var_rows], start)
+            if selected is None:
+                print(f"No optimal solution for lineup {i} in Stage 2.")
+                break
 
+            selected_vars = np.flatnonzero(selected)
+            selected_rows = self.var_rows[selected_vars]
+            final_lineup = self._assign_slots(
+                [(table.players[self.var_rows[index]], self.var_positions[index]) for index in selected_vars]
+            )
+            if final_lineup is None:
+                print(f"No roster slot assignment for lineup {i}.")
+                break
+            player_exposure_counts[selected_rows] += 1
 
+            self.adjust_roster_for_late_swap(final_lineup)
+            generated.append(final_lineup)
+            previous_lineup = final_lineup
+            model.add_uniqueness_cut(selected_rows, len(selected_vars), self.num_uniques, f"Uniqueness_{i}")
 
+        return generated
 
+    def _run_parallel(self, workers):
+        """
+        Generate the lineups in a process pool.
+
+        The lineups are split into one chunk per worker. Every worker builds its own model
+        and draws its perturbations from its own stream spawned from SeedSequence(seed), so
+        a fixed seed reproduces the same chunks. The chunks are merged in worker order: a
+        lineup sharing more than roster size - num_uniques players with an already accepted
+        lineup is dropped, and the dropped lineups (plus any a worker failed to produce) are
+        re-solved here against the accepted ones from one more stream.
+        :param workers: Number of worker processes.
+        :return: List of lineups as lists of (player, position) pairs.
+        """
+        streams = np.random.SeedSequence(self.config.seed).spawn(workers + 1)
+        counts = [self.num_lineups // workers + (k < self.num_lineups % workers) for k in range(workers)]
+        worker_config = self.config.overlay(workers=1)
+
+        print(f"Generating {self.num_lineups} lineups with {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _generate_chunk, self.site, self.players, self.player_table,
+                    worker_config, count, self.num_uniques, stream,
+                )
+                for count, stream in zip(counts, streams)
+            ]
+            chunks = [future.result() for future in futures]
+
+        table = self.player_table
+        accepted, accepted_rows = [], []
+        conflicts = 0
+        for chunk in chunks:
+            for lineup in chunk:
+                rows = {table.index_of[player_id] for player_id, _ in lineup}
+                if any(len(rows & other) > len(lineup) - self.num_uniques for other in accepted_rows):
+                    conflicts += 1
+                    continue
+                accepted.append([(table.players[table.index_of[player_id]], position) for player_id, position in lineup])
+                accepted_rows.append(rows)
+
+        missing = self.num_lineups - len(accepted)
+        if missing:
+            print(f"Re-solving {missing} lineups ({conflicts} not unique across workers)")
+            self.rng = np.random.default_rng(streams[-1])
+            accepted += self._generate(missing, fixed_lineups=accepted)
+        return accepted
+
+
+def _generate_chunk(site, players, player_table, config, num_lineups, num_uniques, seed_sequence):
+    """
+    Worker of Optimizer._run_parallel: generate a chunk of lineups in this process.
+    :param seed_sequence: SeedSequence of the worker's random stream.
+    :return: List of lineups as lists of (player id, position) pairs.
+    """
+    optimizer = Optimizer(
+        site, players, num_lineups, num_uniques, config,
+        player_table=player_table, rng=np.random.default_rng(seed_sequence),
+    )
+    return [[(player.id, position) for player, position in lineup] for lineup in optimizer._generate(num_lineups)]
@@ -0,0 +1,188 @@
+import numpy as np
+from data.player_table import POSITION_BITS
+from optimizer.constraints import salary_limits
+from optimizer.slots import position_limits
+
+# Frontier sweep terms (explore_fpts_ownership_tradeoff): a minimum fpts and the
+# ownership sum to minimize
+FRONTIER_TERMS = {"fpts": 1, "ownership": -1}
+
+# Terms sample_objectives divides by their pool maximum
+SCALED_TERMS = ("boom_pct", "ownership")
+
+
+def presolve_applies(config, num_lineups):
+    """
+    :return: True if presolve is set and exact for a build: one lineup without randomness,
+             so Optimizer.run solves a single fixed objective. Prints why it is skipped otherwise.
+    """
+    if not config.get("presolve"):
+        return False
+    if num_lineups != 1 or config.get("randomness_amount", 10):
+        print("Presolve skipped: it is only exact for one lineup with randomness_amount 0.")
+        return False
+    return True
+
+
+def objective_terms(config):
+    """
+    PlayerTable columns that Optimizer.run optimizes or constrains under a config, with the
+    direction that is better: 1 if more is better, -1 if less is better.
+    """
+    terms = {"fpts": 1}  # min_fpts and the stage-1 solve
+    if config.get("ceiling_weight", 1.0):
+        terms["boom_pct"] = 1
+    if config.get("ownership_weight", 1.0) or config.get("max_ownership_sum") is not None:
+        terms["ownership"] = -1
+    return terms
+
+
+def dominance_matrix(site, player_table, config, terms):
+    """
+    dominates[q, p] is True where player q can replace player p in any lineup without
+    making it worse or infeasible, slot eligibility aside:
+    - q is at least as good as p on every term (0: equal),
+    - q's salary is not higher, and only lower when the minimum lineup salary cannot
+      bind on the swap (see _floor_safe),
+    - q plays for the same team unless no team limit or team salary limit can bind on
+      q's team, and in the same game unless no matchup limit can bind on q's game
+      (see _unlimited_rows).
+    Players equal on everything are ordered by table row, so the relation stays a strict order.
+    """
+    table = player_table
+    dominates = np.ones((len(table), len(table)), dtype=bool)
+    strictly = np.zeros((len(table), len(table)), dtype=bool)
+    for column, direction in terms.items():
+        values = np.asarray(getattr(table, column), dtype=float)
+        q, p = values[:, np.newaxis], values[np.newaxis, :]
+        if direction > 0:
+            dominates &= q >= p
+            strictly |= q > p
+        elif direction < 0:
+            dominates &= q <= p
+            strictly |= q < p
+        else:
+            dominates &= q == p
+
+    salary = np.asarray(table.salary, dtype=float)
+    q, p = salary[:, np.newaxis], salary[np.newaxis, :]
+    dominates &= (q == p) | ((q < p) & _floor_safe(site, table, config)[:, np.newaxis])
+    strictly |= q < p
+
+    roster_size = sum(position_limits(site).values())
+    if config.get("team_limits") or config.get("max_team_salary"):
+        unlimited = _unlimited_rows(
+            table.team_code, table.teams, salary, roster_size,
+            config.get("team_limits", {}), config.get("max_team_salary"),
+        )
+        dominates &= (table.team_code[:, np.newaxis] == table.team_code[np.newaxis, :]) | unlimited[:, np.newaxis]
+    if config.get("matchup_limits"):
+        unlimited = _unlimited_rows(table.game_code, table.games, salary, roster_size, config["matchup_limits"])
+        dominates &= (table.game_code[:, np.newaxis] == table.game_code[np.newaxis, :]) | unlimited[:, np.newaxis]
+
+    rows = np.arange(len(table))
+    dominates &= strictly | (rows[:, np.newaxis] < rows[np.newaxis, :])
+    return dominates
+
+
+def _floor_safe(site, player_table, config):
+    """
+    :return: Boolean mask of the players that can replace a more expensive one without
+             breaking the minimum lineup salary: their salary plus the cheapest roster
+             size - 1 salaries of the pool already reaches it. All True without a minimum.
+    """
+    min_salary, _ = salary_limits(site, config)
+    salary = np.asarray(player_table.salary, dtype=float)
+    if min_salary is None:
+        return np.ones(len(salary), dtype=bool)
+    cheapest_rest = np.sort(salary)[:sum(position_limits(site).values()) - 1].sum()
+    return salary + cheapest_rest >= min_salary
+
+
+def _unlimited_rows(codes, names, salary, roster_size, count_limits, salary_limit=None):
+    """
+    :param codes: Group code per player (PlayerTable.team_code or game_code).
+    :param names: Group name per code (PlayerTable.teams or games).
+    :param count_limits: Dict of group name -> maximum players.
+    :param salary_limit: Optional maximum salary per group.
+    :return: Boolean mask of the players whose group cannot reach its limits, even with
+             its roster size most expensive players in the lineup.
+    """
+    unlimited = np.ones(len(codes), dtype=bool)
+    for code, name in enumerate(names):
+        rows = codes == code
+        top_salary = np.sort(salary[rows])[::-1][:roster_size].sum()
+        if (
+            min(int(rows.sum()), roster_size) > count_limits.get(name, roster_size)
+            or (salary_limit and top_salary > salary_limit)
+        ):
+            unlimited[rows] = False
+    return unlimited
+
+
+def dominated_players(site, player_table, config, terms, keep=None):
+    """
+    Find the players no optimal lineup needs.
+
+    A player is dominated when, for every slot they can fill, at least roster size other
+    players eligible for that slot dominate them (see dominance_matrix): at most roster
+    size - 1 of those can already be in the lineup, so one is always free to take the
+    player's slot. Dominance is transitive, so removing every dominated player at once
+    still leaves enough dominators. This only holds for a single solve with a fixed
+    objective over the given terms (see presolve_applies, and the frontier sweep).
+    :param site: 'dk' or 'fd'.
+    :param player_table: PlayerTable of the pool.
+    :param config: Config with the constraint settings.
+    :param terms: Dict of PlayerTable column -> 1 (more is better), -1 (less is better)
+                  or 0 (must be equal), see objective_terms and FRONTIER_TERMS.
+    :param keep: Optional boolean mask of players that are never removed but may dominate.
+    :return: Tuple of (boolean mask of dominated players, dominator count per player,
+             the smallest over the player's slots).
+    """
+    limits = position_limits(site)
+    roster_size = sum(limits.values())
+    dominates = dominance_matrix(site, player_table, config, terms)
+
+    counts = np.full(len(player_table), np.iinfo(np.int64).max)
+    for slot in limits:
+        eligible = (player_table.position_bits & POSITION_BITS[slot]) != 0
+        slot_counts = (dominates & eligible[:, np.newaxis]).sum(axis=0)
+        counts = np.where(eligible, np.minimum(counts, slot_counts), counts)
+    counts[player_table.position_bits == 0] = 0
+
+    dominated = (counts >= roster_size) & (player_table.position_bits != 0)
+    if keep is not None:
+        dominated &= ~np.asarray(keep, dtype=bool)
+    return dominated, counts
+
+
+def scale_holders(player_table, terms):
+    """
+    :return: Boolean mask of the players holding the pool maximum of a scaled term in use.
+             sample_objectives divides by that maximum, so removing them changes the objective.
+    """
+    holders = np.zeros(len(player_table), dtype=bool)
+    for column in SCALED_TERMS:
+        if column in terms and len(player_table):
+            values = np.asarray(getattr(player_table, column), dtype=float)
+            holders |= values == values.max()
+    return holders
+
+
+def presolve_players(site, players, player_table, config, terms=None):
+    """
+    Drop the dominated players from an optimizer pool and report them.
+    :param players: Players of the pool, in PlayerTable order.
+    :param terms: Objective terms (default: objective_terms(config)).
+    :return: List of the remaining players.
+    """
+    terms = objective_terms(config) if terms is None else terms
+    dominated, counts = dominated_players(
+        site, player_table, config, terms, keep=scale_holders(player_table, terms)
+    )
+    print(f"Presolve removed {int(dominated.sum())} of {len(players)} dominated players "
+          f"(terms: {', '.join(terms)})")
+    for row in np.flatnonzero(dominated):
+        player = players[row]
+        print(f"  {player.name} ({player.team}, {player.salary}): {counts[row]} dominators")
+    return [player for player, keep in zip(players, ~dominated) if keep]
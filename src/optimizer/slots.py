@@ -0,0 +1,161 @@
+import numpy as np
+import pulp as plp
+from data.player_table import POSITION_BITS
+
+# Players per roster position
+POSITION_LIMITS = {
+    "dk": {"PG": 1, "SG": 1, "SF": 1, "PF": 1, "C": 1, "G": 1, "F": 1, "UTIL": 1},
+    "fd": {"PG": 2, "SG": 2, "SF": 2, "PF": 2, "C": 1},
+}
+
+
+def position_limits(site):
+    """
+    :return: Dict of roster position -> number of players of a site.
+    """
+    return POSITION_LIMITS["dk"] if site == "dk" else POSITION_LIMITS["fd"]
+
+
+def slot_masks(position_bits, slots):
+    """
+    :param position_bits: PlayerTable.position_bits (or any array of position bits).
+    :param slots: Roster positions in slot order.
+    :return: Integer array with bit i set where the player is eligible for slots[i].
+    """
+    position_bits = np.asarray(position_bits, dtype=np.int64)
+    masks = np.zeros(len(position_bits), dtype=np.int64)
+    for index, slot in enumerate(slots):
+        masks |= np.where(position_bits & POSITION_BITS[slot], 1 << index, 0)
+    return masks
+
+
+def hall_groups(masks, capacities):
+    """
+    Counting constraints under which a set of players can fill the roster slots.
+
+    By Hall's theorem, roster size players fill slots with the given capacities exactly
+    when, for every slot set U, at most capacity(U) of them are eligible only for slots in
+    U. Only unions of the players' eligibility sets can bind, and sets whose capacity
+    reaches the roster size follow from the player count, so only those are returned.
+    :param masks: Eligible slot bitmask per player (see slot_masks).
+    :param capacities: Players per slot, in slot order.
+    :return: List of (slot bitmask U, capacity of U); the group of U is every player
+             with masks & ~U == 0.
+    """
+    total = sum(capacities)
+    unions = set()
+    for mask in set(np.asarray(masks).tolist()):
+        unions |= {union | mask for union in unions} | {mask}
+    groups = []
+    for union in sorted(unions):
+        capacity = sum(count for index, count in enumerate(capacities) if union >> index & 1)
+        if capacity < total:
+            groups.append((union, capacity))
+    return groups
+
+
+def assign_slots(masks, capacities, fixed=None):
+    """
+    Assign players to roster slots with a bipartite matching (augmenting paths).
+    :param masks: Eligible slot bitmask of each player to place.
+    :param capacities: Players per slot, in slot order.
+    :param fixed: Optional dict of player index -> slot index the player must keep.
+    :return: List with the slot index of every player, or None if the players cannot fill the slots.
+    """
+    fixed = fixed or {}
+    seats = [slot for slot, capacity in enumerate(capacities) for _ in range(capacity)]
+    owner = [None] * len(seats)
+    for player, slot in fixed.items():
+        free = [seat for seat, seat_slot in enumerate(seats) if seat_slot == slot and owner[seat] is None]
+        if not free:
+            return None
+        owner[free[0]] = player
+
+    def place(player, visited):
+        for seat, slot in enumerate(seats):
+            if masks[player] >> slot & 1 and seat not in visited and owner[seat] not in fixed:
+                visited.add(seat)
+                if owner[seat] is None or place(owner[seat], visited):
+                    owner[seat] = player
+                    return True
+        return False
+
+    for player in range(len(masks)):
+        if player not in fixed and not place(player, set()):
+            return None
+    assignment = [None] * len(masks)
+    for seat, player in enumerate(owner):
+        if player is not None:
+            assignment[player] = seats[seat]
+    return assignment
+
+
+def assign_lineup_slots(site, players, fixed=None):
+    """
+    Give the players of a player-level solution their roster slots.
+    :param site: 'dk' or 'fd'.
+    :param players: Selected Player objects.
+    :param fixed: Optional dict of player id -> slot the player must keep (locked players).
+    :return: List of (player, slot) pairs, or None if the players cannot fill the roster.
+    """
+    limits = position_limits(site)
+    slots = list(limits)
+    masks = [
+        sum(1 << index for index, slot in enumerate(slots) if slot in player.position)
+        for player in players
+    ]
+    fixed = {
+        index: slots.index(fixed[player.id])
+        for index, player in enumerate(players)
+        if fixed and player.id in fixed
+    }
+    assignment = assign_slots(masks, list(limits.values()), fixed)
+    if assignment is None:
+        return None
+    return [(player, slots[slot]) for player, slot in zip(players, assignment)]
+
+
+def variable_keys(lineup, formulation):
+    """
+    LP variable keys of a lineup: the (player, slot) pairs themselves, or (player, None)
+    in the player-level formulation.
+    :param lineup: List of (player, slot) pairs.
+    :param formulation: 'slot' or 'player'.
+    """
+    if formulation == "player":
+        return [(player, None) for player, _ in lineup]
+    return list(lineup)
+
+
+def create_variables(player_table, var_rows, var_positions, suffix=""):
+    """
+    One binary LP variable per (player, position) pair of a variable layout.
+    :param var_rows: Table row per variable, see PlayerTable.variable_layout.
+    :param var_positions: Position per variable (None in the player-level formulation).
+    :param suffix: Optional suffix appended to every variable name.
+    :return: Dict of (player, position) -> LpVariable, in layout order.
+    """
+    lp_variables = {}
+    for row, position in zip(var_rows, var_positions):
+        player = player_table.players[row]
+        lp_variables[(player, position)] = plp.LpVariable(
+            name=f"{player.name}_{position}_{player.id}{suffix}", cat=plp.LpBinary
+        )
+    return lp_variables
+
+
+def cached_variables(cache, player_table, formulation):
+    """
+    Variable layout and LP variables of a pool, built on first use and kept in the cache
+    shared by every optimizer over the pool (see SlateSession).
+    :param cache: Dict of structures shared over the pool.
+    :param formulation: 'slot' or 'player'.
+    :return: Tuple of (var_rows, var_positions, lp_variables).
+    """
+    layout_key, variables_key = ("variable_layout", formulation), ("lp_variables", formulation)
+    if layout_key not in cache:
+        cache[layout_key] = player_table.variable_layout(formulation)
+    var_rows, var_positions = cache[layout_key]
+    if variables_key not in cache:
+        cache[variables_key] = create_variables(player_table, var_rows, var_positions)
+    return var_rows, var_positions, cache[variables_key]
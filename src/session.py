@@ -0,0 +1,104 @@
+from data.data_manager import DataManager
+from optimizer.optimizer import Optimizer
+from optimizer.late_swaptimizer import LateSwaptimizer
+from optimizer.presolve import presolve_applies, presolve_players
+from utils.config import load_config
+
+
+# Player fields that never change pool membership or the static constraints
+_COEFFICIENT_ONLY_FIELDS = {"minutes", "ceiling", "boom_pct", "bust_pct", "stddev", "ownership"}
+
+
+class SlateSession:
+    """
+    Keeps several slates loaded in one warm process.
+
+    Every slate has its own DataManager. The optimizer pool of a slate (players above
+    projection_minimum), its PlayerTable and the LP variables and compiled constraints
+    built over it are cached and shared by every optimizer the session creates.
+    """
+
+    def __init__(self):
+        self.slates = {}
+        self._pools = {}
+
+    def add_slate(self, name, site, config_path=None, use_cache=True):
+        """
+        Load a slate into the session.
+        :param name: Name used to refer to the slate (e.g. 'main', 'early', 'turbo').
+        :param site: Site of the slate ('dk' or 'fd').
+        :param config_path: Optional slate-specific config file (see load_config).
+        :param use_cache: Reuse the slate snapshot when none of the inputs changed.
+        :return: The slate's DataManager.
+        """
+        data_manager = DataManager(site, load_config(site, config_path))
+        data_manager.load_player_data(use_cache=use_cache)
+        self.slates[name] = data_manager
+        self._pools.pop(name, None)
+        return data_manager
+
+    def data_manager(self, name):
+        return self.slates[name]
+
+    def player_pool(self, name):
+        """
+        Optimizer pool of a slate, built once and reused until the slate changes.
+        :param name: Slate name.
+        :return: Tuple of (players, player_table, cache).
+        """
+        if name not in self._pools:
+            data_manager = self.slates[name]
+            players = [
+                player for player in data_manager.players
+                if player.fpts > data_manager.config.get("projection_minimum")
+            ]
+            self._pools[name] = (players, data_manager.build_player_table(players), {})
+        return self._pools[name]
+
+    def optimizer(self, name, num_lineups, num_uniques, config=None):
+        """
+        Create an Optimizer over the slate's cached pool.
+        When presolve applies to the build (see presolve.presolve_applies), the optimizer
+        gets its own pool without the dominated players; the shared pool stays whole.
+        :param config: Config to optimize with (default: the slate's config).
+        """
+        data_manager = self.slates[name]
+        config = config if config is not None else data_manager.config
+        players, player_table, cache = self.player_pool(name)
+        if presolve_applies(config, num_lineups):
+            players = presolve_players(data_manager.site, players, player_table, config)
+            player_table, cache = data_manager.build_player_table(players), {}
+        return Optimizer(
+            data_manager.site, players, num_lineups, num_uniques, config,
+            player_table=player_table, cache=cache,
+        )
+
+    def late_swaptimizer(self, name, entries, config=None):
+        """
+        Create a LateSwaptimizer over the slate's cached pool.
+        :param entries: EntryTable with the entries to swap.
+        :param config: Config to optimize with (default: the slate's config).
+        """
+        data_manager = self.slates[name]
+        players, player_table, cache = self.player_pool(name)
+        return LateSwaptimizer(
+            data_manager.site, players,
+            config if config is not None else data_manager.config,
+            entries, player_table=player_table, cache=cache,
+        )
+
+    def reload(self, name):
+        """
+        Reload the slate's changed input files and invalidate what they affect.
+        Changes limited to coefficient-only fields refresh the cached PlayerTable;
+        anything else (fpts, positions) rebuilds the pool on next use.
+        :return: Change set returned by DataManager.reload_changed.
+        """
+        changes = self.slates[name].reload_changed()
+        if changes and name in self._pools:
+            changed_fields = {field for fields in changes.values() for field in fields}
+            if changed_fields <= _COEFFICIENT_ONLY_FIELDS:
+                self._pools[name][1].refresh()
+            else:
+                del self._pools[name]
+        return changes
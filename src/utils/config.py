@@ -1,5 +1,8 @@
 import os
 import json
+import hashlib
+from collections.abc import Mapping
+from types import MappingProxyType
 
 
 def get_project_root():
@@ -9,14 +12,194 @@ def get_project_root():
     return os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 
 
-def load_config(site):
+_NUMBER = (int, float)
+
+# Known configuration keys: expected type(s) and the default returned by attribute access.
+# Keys that are not listed here are kept as-is without validation.
+CONFIG_SCHEMA = {
+    "projection_path": (str, None),
+    "player_path": (str, None),
+    "ownership_path": (str, None),
+    "boom_bust_path": (str, None),
+    "late_swap_path": (str, None),
+    "output_path": (str, "data/output"),
+    "snapshot_cache_path": (str, None),
+    "csv_backend": (str, "auto"),
+    "db_path": (str, None),
+    "name_match_cutoff": (_NUMBER, 0.85),
+    "matchup_limits": (Mapping, {}),
+    "team_limits": (Mapping, {}),
+    "max_team_salary": (_NUMBER, None),
+    "projection_minimum": (_NUMBER, 0),
+    "min_lineup_salary": (_NUMBER, None),
+    "fpts_buffer": (_NUMBER, 0.98),
+    "max_ownership_sum": (_NUMBER, None),
+    "min_fpts": (_NUMBER, None),
+    "ceiling_weight": (_NUMBER, 1.0),
+    "ownership_weight": (_NUMBER, 1.0),
+    "randomness_amount": (_NUMBER, 10),
+    "exposure_penalty": (_NUMBER, 0.1),
+    "contest_params": (Mapping, {}),
+    "persistent_model": (bool, True),
+    # "pulp", or "matrix" for optimizer/matrix_model.py: solves with highspy for solver
+    # "highs"/"auto" and with scipy.optimize.milp otherwise (no CBC/GLPK), always persistent
+    "model_builder": (str, "pulp"),
+    "formulation": (str, "slot"),
+    # Drop dominated players before one-lineup builds with randomness_amount 0 and the
+    # derivative.py frontier sweep (see optimizer/presolve.py). None of the shipped
+    # contest_params qualify, and with min_lineup_salary or max_team_salary set few or no
+    # players are dominated (none on the sample slate)
+    "presolve": (bool, False),
+    # "auto" tries in-process HiGHS first, then CBC and GLPK, which run a subprocess per
+    # solve (see optimizer/solvers.py); pair HiGHS with formulation "player"
+    "solver": (str, "auto"),
+    # MIP starts from the previous lineup (late swap: the entry roster); only HiGHS takes them
+    "warm_start": (bool, True),
+    "workers": (int, 1),
+    "seed": (int, None),
+}
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Inverse of _freeze, producing plain dicts and lists."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def json_default(value):
+    """
+    `default` hook for json.dumps so Config objects and frozen mappings serialize as dicts.
+    """
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, tuple):
+        return list(value)
+    return str(value)
+
+
+def validate_config(values):
+    """
+    Check the types of the known configuration keys.
+    :param values: Mapping of configuration keys to values.
+    :raises ValueError: If a known key has a value of the wrong type.
+    """
+    for key, value in values.items():
+        if key not in CONFIG_SCHEMA or value is None:
+            continue
+        expected, _ = CONFIG_SCHEMA[key]
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            raise ValueError(f"Invalid config value for '{key}': {value!r}")
+
+
+class Config(Mapping):
+    """
+    Validated, immutable configuration.
+
+    Reads work like a dict (config["key"], config.get("key")), and known keys are also
+    available as attributes that fall back to the CONFIG_SCHEMA default (config.ceiling_weight).
+    overlay() derives a new Config that layers a few overrides on top of this one without
+    copying it, so contest styles can share one base config across threads and processes.
+    """
+
+    __slots__ = ("_values", "_parent", "_fingerprint")
+
+    def __init__(self, values, parent=None):
+        validate_config(values)
+        object.__setattr__(self, "_values", _freeze(values))
+        object.__setattr__(self, "_parent", parent)
+        object.__setattr__(self, "_fingerprint", None)
+
+    def __getitem__(self, key):
+        config = self
+        while config is not None:
+            if key in config._values:
+                return config._values[key]
+            config = config._parent
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        config = self
+        while config is not None:
+            if key in config._values:
+                return True
+            config = config._parent
+        return False
+
+    def _keys(self):
+        keys = dict.fromkeys(self._parent._keys()) if self._parent is not None else {}
+        keys.update(dict.fromkeys(self._values))
+        return keys
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self):
+        return len(self._keys())
+
+    def __getattr__(self, name):
+        if name in CONFIG_SCHEMA:
+            return self.get(name, CONFIG_SCHEMA[name][1])
+        raise AttributeError(f"Config has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config is immutable; use overlay() to derive a modified config")
+
+    def __reduce__(self):
+        # Pickle as one flat layer so workers receive a self-contained config
+        return Config, (self.to_dict(),)
+
+    def __repr__(self):
+        return f"Config({self.to_dict()!r})"
+
+    def overlay(self, **overrides):
+        """
+        Derive a config with some keys overridden, e.g. per contest style.
+        :param overrides: Keys to override.
+        :return: New Config backed by this one.
+        """
+        return Config(overrides, parent=self)
+
+    def to_dict(self):
+        """
+        :return: Plain, mutable dictionary copy of the resolved configuration.
+        """
+        return {key: _thaw(self[key]) for key in self}
+
+    def fingerprint(self):
+        """
+        :return: Stable hash of the resolved configuration.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True, default=str).encode())
+            object.__setattr__(self, "_fingerprint", digest.hexdigest())
+        return self._fingerprint
+
+
+def load_config(site, config_path=None):
     """
     Load the configuration file for the specified site (e.g., 'dk', 'fd').
     :param site: The site for which to load the configuration ('dk' or 'fd').
-    :return: The loaded configuration as a dictionary.
+    :param config_path: Optional path of a slate-specific config file, absolute or
+                        relative to the project root (default: data/config/<site>_config.json).
+    :return: The loaded configuration as an immutable Config.
     """
-    config_path = os.path.join(get_project_root(), "data", "config", f"{site}_config.json")
+    if config_path is None:
+        config_path = os.path.join(get_project_root(), "data", "config", f"{site}_config.json")
+    else:
+        config_path = os.path.join(get_project_root(), config_path)
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     with open(config_path, encoding="utf-8-sig") as file:
-        return json.load(file)
+        return Config(json.load(file))
@@ -1,9 +1,22 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
+import unicodedata
+import numpy as np
 import pytz
 
+# Epoch returned by parse_game_times for game info strings that cannot be parsed
+NO_GAME_TIME = np.iinfo(np.int64).max
+
+# Generational suffixes dropped by normalize_name
+NAME_SUFFIXES = frozenset(("jr", "sr", "ii", "iii", "iv", "v"))
+_NAME_PUNCTUATION = str.maketrans({".": None, "'": None, "\u2019": None, "-": " ", ",": " "})
+
+
+@lru_cache(maxsize=None)
 def parse_game_time(game_info, timezone="US/Eastern", lock_offset_hours=0):
     """
     Parse game time from the Game Info string and adjust it to include a lock offset.
+    Results are cached per argument tuple; a slate only has a handful of distinct games.
     
     :param game_info: String containing game info (e.g., "GB@PHI 09/06/2024 08:15PM ET").
     :param timezone: Timezone of the game times (default: US/Eastern).
@@ -19,3 +32,42 @@ def parse_game_time(game_info, timezone="US/Eastern", lock_offset_hours=0):
         return lock_time
     except Exception as e:
         raise ValueError(f"Error parsing game info '{game_info}': {e}")
+
+
+def parse_game_times(game_infos, timezone="US/Eastern", lock_offset_hours=0):
+    """
+    Parse a column of Game Info strings into lock times, parsing each distinct string once.
+
+    :param game_infos: Sequence of game info strings.
+    :param timezone: Timezone of the game times (default: US/Eastern).
+    :param lock_offset_hours: Number of hours to subtract for lock time.
+    :return: int64 array of Unix epoch lock times (NO_GAME_TIME where parsing failed).
+    """
+    distinct, inverse = np.unique(np.asarray(game_infos, dtype=str), return_inverse=True)
+    epochs = np.full(len(distinct), NO_GAME_TIME, dtype=np.int64)
+    for i, game_info in enumerate(distinct.tolist()):
+        try:
+            epochs[i] = int(parse_game_time(game_info, timezone, lock_offset_hours).timestamp())
+        except ValueError:
+            pass
+    return epochs[inverse.reshape(-1)]
+
+
+def normalize_name(name):
+    """
+    Normalize a player name for matching across data sources.
+
+    Accents, periods and apostrophes are dropped, hyphens become spaces and generational
+    suffixes (Jr, Sr, II, III, IV, V) are removed, so "Luka Dončić", "P.J. Washington Jr."
+    and "Kelly Oubre-Jr" match their DraftKings spellings.
+
+    :param name: Player name as it appears in a CSV file.
+    :return: Lower-cased name with surrounding and repeated whitespace removed.
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char)).casefold()
+    name = name.translate(_NAME_PUNCTUATION)
+    parts = name.split()
+    while len(parts) > 1 and parts[-1] in NAME_SUFFIXES:
+        parts.pop()
+    return " ".join(parts)